@@ -0,0 +1,369 @@
+"""Load generator: many simulated rooms driving a real server over Socket.IO.
+
+Starts ``python -m backend.app`` once per async mode. It then connects
+``--rooms`` x ``--players`` asyncio Socket.IO clients. Each room runs a
+match: the drawer streams Excalidraw deltas and the guessers spam
+guesses. The run reports event latency, server CPU/RSS per room and
+broadcast throughput, and writes everything to a JSON file.
+
+Needs the asyncio client extras on top of backend/requirements.txt:
+
+    pip install "python-socketio[asyncio_client]"
+
+Example:
+
+    python -m backend.bench.loadgen --rooms 200 --players 5 --duration 30 \\
+        --async-modes eventlet,threading --out bench_results.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import aiohttp
+import socketio
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _now_ms() -> float:
+    return time.time() * 1000
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return round(ordered[idx], 3)
+
+
+def _proc_usage(pid: int) -> tuple[float, int]:
+    """(cpu seconds, rss bytes) of a process, read from /proc (Linux only)."""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu_sec = (int(fields[11]) + int(fields[12])) / ticks
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    return cpu_sec, rss
+
+
+@dataclass
+class Stats:
+    draw_latency_ms: list[float] = field(default_factory=list)
+    chat_latency_ms: list[float] = field(default_factory=list)
+    received: dict[str, int] = field(default_factory=dict)
+    received_bytes: int = 0
+    sent: dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def count_sent(self, event: str) -> None:
+        self.sent[event] = self.sent.get(event, 0) + 1
+
+
+class Player:
+    def __init__(self, base_url: str, room_code: str, name: str, stats: Stats) -> None:
+        self.base_url = base_url
+        self.room_code = room_code
+        self.name = name
+        self.stats = stats
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.state: dict = {}
+        self.state_event = asyncio.Event()
+        self._register()
+
+    def _register(self) -> None:
+        stats = self.stats
+
+        @self.sio.on("*")
+        async def _any(event, data=None):
+            stats.received[event] = stats.received.get(event, 0) + 1
+            try:
+                stats.received_bytes += len(json.dumps(data, separators=(",", ":")))
+            except (TypeError, ValueError):
+                pass
+
+            if event == "room:state" and isinstance(data, dict):
+                self.state = data
+                self.state_event.set()
+            elif event == "draw:excalidraw_change" and isinstance(data, dict):
+                now = _now_ms()
+                for el in data.get("elements") or []:
+                    sent_at = (el.get("customData") or {}).get("sentAtMs")
+                    if isinstance(sent_at, (int, float)):
+                        stats.draw_latency_ms.append(now - sent_at)
+            elif event == "chat:message" and isinstance(data, dict):
+                text = str(data.get("text", ""))
+                if text.startswith("bench:"):
+                    try:
+                        stats.chat_latency_ms.append(_now_ms() - float(text.split(":", 1)[1]))
+                    except ValueError:
+                        pass
+
+    @property
+    def sid(self) -> str | None:
+        return self.sio.get_sid()
+
+    async def connect(self) -> None:
+        await self.sio.connect(self.base_url, transports=["websocket"])
+        await self.emit("room:join", {"roomCode": self.room_code, "name": self.name, "playerKey": uuid.uuid4().hex})
+
+    async def emit(self, event: str, data: dict) -> None:
+        self.stats.count_sent(event)
+        try:
+            await self.sio.emit(event, data)
+        except Exception:
+            self.stats.errors += 1
+
+    async def close(self) -> None:
+        try:
+            await self.sio.disconnect()
+        except Exception:
+            pass
+
+
+def _freedraw_element(element_id: str, version: int, points: int) -> dict:
+    pts = [[i * 1.5, (i % 7) * 2.25] for i in range(points)]
+    return {
+        "id": element_id,
+        "type": "freedraw",
+        "x": 100.0,
+        "y": 100.0,
+        "width": 300.0,
+        "height": 20.0,
+        "strokeColor": "#1e1e1e",
+        "strokeWidth": 2,
+        "version": version,
+        "versionNonce": random.randint(1, 2**31),
+        "isDeleted": False,
+        "points": pts,
+        "pressures": [],
+        "simulatePressure": True,
+        "customData": {"sentAtMs": _now_ms()},
+    }
+
+
+async def _run_room(base_url: str, http: aiohttp.ClientSession, idx: int, args, stats: Stats, stop: asyncio.Event) -> None:
+    async with http.post(f"{base_url}/api/rooms") as resp:
+        room_code = (await resp.json())["roomCode"]
+
+    players = [Player(base_url, room_code, f"b{idx}-{i}", stats) for i in range(args.players)]
+    try:
+        for p in players:
+            await p.connect()
+        owner = players[0]
+        await asyncio.wait_for(owner.state_event.wait(), timeout=10)
+        await owner.emit("game:start", {"roomCode": room_code})
+
+        while not stop.is_set():
+            await _play_round(room_code, players, args, stats, stop)
+    except Exception:
+        stats.errors += 1
+    finally:
+        for p in players:
+            await p.close()
+
+
+async def _play_round(room_code: str, players: list[Player], args, stats: Stats, stop: asyncio.Event) -> None:
+    # Wait for the drawer to get its word choices, then pick one.
+    drawer = None
+    owner = players[0]
+    deadline = time.monotonic() + 15
+    next_start = 0.0
+    while drawer is None and not stop.is_set():
+        if time.monotonic() > deadline:
+            raise TimeoutError("no drawer")
+        # Match over: start the next one.
+        if owner.state.get("state") == "lobby" and time.monotonic() >= next_start:
+            next_start = time.monotonic() + 1
+            await owner.emit("game:start", {"roomCode": room_code})
+        for p in players:
+            st = p.state
+            if st.get("drawerId") == p.sid and st.get("state") in ("choosing", "playing"):
+                drawer = p
+        await asyncio.sleep(0.05)
+    if drawer is None:
+        return
+
+    if drawer.state.get("state") == "choosing" and drawer.state.get("wordChoices"):
+        await drawer.emit("game:choose_word", {"roomCode": room_code, "word": drawer.state["wordChoices"][0]})
+
+    guessers = [p for p in players if p is not drawer]
+    element_ids = [uuid.uuid4().hex for _ in range(args.elements)]
+    versions = {eid: 1 for eid in element_ids}
+    draw_interval = 1 / args.draw_hz
+    guess_interval = 1 / args.guess_hz if args.guess_hz > 0 else None
+    next_guess = time.monotonic()
+    round_end = time.monotonic() + args.round_sec
+
+    while not stop.is_set() and time.monotonic() < round_end:
+        if drawer.state.get("state") != "playing":
+            await asyncio.sleep(0.05)
+            continue
+
+        batch = random.sample(element_ids, min(len(element_ids), args.delta_size))
+        elements = []
+        for eid in batch:
+            versions[eid] += 1
+            elements.append(_freedraw_element(eid, versions[eid], args.points))
+        await drawer.emit("draw:excalidraw_change", {"roomCode": room_code, "elements": elements})
+
+        if guess_interval is not None and time.monotonic() >= next_guess:
+            next_guess = time.monotonic() + guess_interval
+            for g in guessers:
+                await g.emit("guess:submit", {"roomCode": room_code, "text": f"bench:{_now_ms()}"})
+
+        await asyncio.sleep(draw_interval)
+
+    if not stop.is_set():
+        if owner.sid == owner.state.get("ownerId"):
+            await owner.emit("game:abort", {"roomCode": room_code})
+
+
+async def _drive(base_url: str, args) -> Stats:
+    stats = Stats()
+    stop = asyncio.Event()
+    async with aiohttp.ClientSession() as http:
+        tasks = []
+        for i in range(args.rooms):
+            tasks.append(asyncio.create_task(_run_room(base_url, http, i, args, stats, stop)))
+            if args.ramp_sec > 0:
+                await asyncio.sleep(args.ramp_sec / args.rooms)
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return stats
+
+
+def _start_server(mode: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        {
+            "HOST": "127.0.0.1",
+            "PORT": str(port),
+            "FLASK_DEBUG": "0",
+            "FLASK_USE_RELOADER": "0",
+            "SOCKETIO_ASYNC_MODE": mode,
+            # Every simulated client shares 127.0.0.1, so per-IP buckets would
+            # throttle the load being measured.
+            "RATE_LIMIT_ENABLED": "0",
+        }
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "backend.app"],
+        cwd=str(REPO_ROOT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_healthy(base_url: str, timeout_sec: float = 20) -> None:
+    deadline = time.monotonic() + timeout_sec
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            try:
+                async with http.get(f"{base_url}/api/health") as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not become healthy")
+
+
+def run_mode(mode: str, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc = _start_server(mode, args.port)
+    try:
+        asyncio.run(_wait_healthy(base_url))
+        cpu0, rss0 = _proc_usage(proc.pid)
+        t0 = time.monotonic()
+        stats = asyncio.run(_drive(base_url, args))
+        elapsed = time.monotonic() - t0
+        cpu1, rss1 = _proc_usage(proc.pid)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    received_total = sum(stats.received.values())
+    return {
+        "asyncMode": mode,
+        "elapsedSec": round(elapsed, 3),
+        "drawLatencyMs": {
+            "p50": _percentile(stats.draw_latency_ms, 50),
+            "p99": _percentile(stats.draw_latency_ms, 99),
+            "samples": len(stats.draw_latency_ms),
+        },
+        "chatLatencyMs": {
+            "p50": _percentile(stats.chat_latency_ms, 50),
+            "p99": _percentile(stats.chat_latency_ms, 99),
+            "samples": len(stats.chat_latency_ms),
+        },
+        "server": {
+            "cpuSec": round(cpu1 - cpu0, 3),
+            "cpuSecPerRoom": round((cpu1 - cpu0) / max(1, args.rooms), 5),
+            "rssBytes": rss1,
+            "rssBytesPerRoom": int((rss1 - rss0) / max(1, args.rooms)),
+        },
+        "broadcast": {
+            "eventsReceived": received_total,
+            "eventsPerSec": round(received_total / elapsed, 1) if elapsed else None,
+            "bytesPerSec": round(stats.received_bytes / elapsed, 1) if elapsed else None,
+            "byEvent": stats.received,
+        },
+        "sent": stats.sent,
+        "errors": stats.errors,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--players", type=int, default=4, help="players per room")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of steady load")
+    parser.add_argument("--ramp-sec", type=float, default=5, help="spread room start-up over this many seconds")
+    parser.add_argument("--round-sec", type=float, default=15, help="drawing time per round before aborting it")
+    parser.add_argument("--draw-hz", type=float, default=30)
+    parser.add_argument("--delta-size", type=int, default=5, help="elements per draw delta")
+    parser.add_argument("--elements", type=int, default=50, help="distinct elements per round")
+    parser.add_argument("--points", type=int, default=40, help="freedraw points per element")
+    parser.add_argument("--guess-hz", type=float, default=1, help="guesses per second per guesser")
+    parser.add_argument("--async-modes", default="eventlet,threading")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    results = {
+        "startedAt": int(time.time()),
+        "params": {k: v for k, v in vars(args).items() if k != "out"},
+        "runs": [],
+    }
+    for mode in [m.strip() for m in args.async_modes.split(",") if m.strip()]:
+        print(f"[bench] {mode}: {args.rooms} rooms x {args.players} players for {args.duration}s", flush=True)
+        run = run_mode(mode, args)
+        results["runs"].append(run)
+        print(
+            f"[bench] {mode}: draw p50={run['drawLatencyMs']['p50']}ms p99={run['drawLatencyMs']['p99']}ms "
+            f"events/s={run['broadcast']['eventsPerSec']} cpu/room={run['server']['cpuSecPerRoom']}s",
+            flush=True,
+        )
+
+    Path(args.out).write_text(json.dumps(results, indent=2))
+    print(f"[bench] wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Serializer benchmark: Socket.IO packet size and encode time on real room payloads.
+
+Builds a room through game.service (players, a drawing scene of freedraw
+elements, chat). It then encodes the room:state, draw:sync,
+draw:excalidraw_change and chat:sync packets with every available backend:
+stdlib json, orjson, and msgpack (needs ``pip install msgpack``).
+
+    python -m backend.bench.serializers --players 8 --elements 300 --points 80
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import uuid
+from pathlib import Path
+
+from socketio import packet
+
+from ..drawful.game import service
+from ..drawful.game.freedraw import decode_elements
+from ..drawful.utils.serializers import OrjsonModule, orjson
+
+
+def _freedraw(points: int) -> dict:
+    x = y = 0.0
+    pts = []
+    for _ in range(points):
+        x += random.uniform(0, 4)
+        y += random.uniform(-3, 3)
+        pts.append([round(x, 4), round(y, 4)])
+    return {
+        "id": uuid.uuid4().hex,
+        "type": "freedraw",
+        "x": random.uniform(0, 800),
+        "y": random.uniform(0, 400),
+        "width": x,
+        "height": 40.0,
+        "strokeColor": "#1e1e1e",
+        "strokeWidth": 2,
+        "version": 1,
+        "versionNonce": random.randint(1, 2**31),
+        "isDeleted": False,
+        "points": pts,
+        "pressures": [],
+        "simulatePressure": True,
+    }
+
+
+def build_payloads(players: int, elements: int, points: int, chat: int) -> dict[str, dict]:
+    room = service.create_room("bench-owner")
+    for i in range(players):
+        service.upsert_player(room, f"sid-{i}", name=f"player{i}", player_key=uuid.uuid4().hex)
+    service.start_match(room)
+
+    scene = [_freedraw(points) for _ in range(elements)]
+    service.apply_draw_change(room, scene)
+    for i in range(chat):
+        room.chat_history.append(f"sid-{i % players}", f"guess number {i}")
+
+    compact = service.draw_sync(room)
+    delta, _ = service.apply_draw_change(room, [_freedraw(points) for _ in range(5)])
+    payloads = {
+        "room:state": service.room_public_state(room),
+        "draw:sync": {"roomCode": room.code, **compact, "elements": decode_elements(compact["elements"])},
+        "draw:sync (compact)": {"roomCode": room.code, **compact},
+        "draw:excalidraw_change": {"roomCode": room.code, "elements": decode_elements(delta)},
+        "chat:sync": {"roomCode": room.code, "messages": room.chat_history.messages()},
+    }
+    service.delete_room(room.code)
+    return payloads
+
+
+def _packet_classes() -> dict[str, type]:
+    classes: dict[str, type] = {"json": packet.Packet}
+    if orjson is not None:
+        classes["orjson"] = type("OrjsonPacket", (packet.Packet,), {"json": OrjsonModule})
+    try:
+        from socketio.msgpack_packet import MsgPackPacket
+    except ImportError:
+        pass
+    else:
+        classes["msgpack"] = MsgPackPacket
+    return classes
+
+
+def run(payloads: dict[str, dict], min_time: float) -> list[dict]:
+    rows = []
+    for backend, cls in _packet_classes().items():
+        for event, data in payloads.items():
+            pkt = cls(packet.EVENT, data=[event.split(" ")[0], data], namespace="/")
+            encoded = pkt.encode()
+            size = len(encoded.encode("utf-8") if isinstance(encoded, str) else encoded)
+            n = 0
+            start = time.perf_counter()
+            while True:
+                pkt.encode()
+                n += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_time:
+                    break
+            rows.append({"backend": backend, "event": event, "bytes": size, "encodeUs": round(elapsed / n * 1e6, 2)})
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--elements", type=int, default=300, help="freedraw elements in the scene")
+    parser.add_argument("--points", type=int, default=80, help="points per freedraw element")
+    parser.add_argument("--chat", type=int, default=200, help="chat messages in history")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds spent timing each encode")
+    parser.add_argument("--out", default="", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rows = run(build_payloads(args.players, args.elements, args.points, args.chat), args.min_time)
+    print(f"{'backend':<8} {'event':<24} {'bytes':>10} {'encode us':>12}")
+    for r in rows:
+        print(f"{r['backend']:<8} {r['event']:<24} {r['bytes']:>10} {r['encodeUs']:>12}")
+    if args.out:
+        Path(args.out).write_text(json.dumps({"params": vars(args), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
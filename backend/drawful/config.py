@@ -1,6 +1,12 @@
 import os
 
 
+def _budget(name: str, default: str) -> tuple[float, float]:
+    """Parse a "<tokens per second>/<burst>" rate limit setting."""
+    rate, _, burst = os.environ.get(name, default).partition("/")
+    return float(rate), float(burst or rate)
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev")
 
@@ -9,16 +15,83 @@ class Config:
 
     # Evil admin
     EVIL_TOKEN = os.environ.get("EVIL_TOKEN", "")
+    # Upper bound for one POST /api/__evil__/profile sampling run.
+    PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", "60"))
 
     # Reverse proxy / IP headers
     TRUST_PROXY_HEADERS = os.environ.get("TRUST_PROXY_HEADERS", "1") == "1"
 
     # Storage (MVP defaults to in-memory)
-    REDIS_URL = os.environ.get("REDIS_URL", "")
+    # ROOM_STORE: "memory" (single process) or "redis" (shared via REDIS_URL)
+    ROOM_STORE = os.environ.get("ROOM_STORE", "memory").strip().lower()
+    # Falls back to a local Redis so ROOM_STORE=redis alone still starts.
+    REDIS_URL = os.environ.get("REDIS_URL", "").strip() or ("redis://localhost:6379/0" if ROOM_STORE == "redis" else "")
+    # Socket.IO message queue for multi-worker fan-out; defaults to REDIS_URL
+    # when ROOM_STORE=redis.
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE", "")
+    # Lease held by the worker that drives a room's deadlines.
+    DEADLINE_LEASE_MS = int(os.environ.get("DEADLINE_LEASE_MS", "5000"))
     MYSQL_DSN = os.environ.get("MYSQL_DSN", "")
 
     # Game
     ROUND_DURATION_SEC = int(os.environ.get("ROUND_DURATION_SEC", "60"))
     WORD_CHOICES_COUNT = int(os.environ.get("WORD_CHOICES_COUNT", "3"))
+    # Directory of extra word packs (<lang>.<name>.txt) loaded at startup.
+    WORD_PACKS_DIR = os.environ.get("WORD_PACKS_DIR", "")
+    WORD_LANG = os.environ.get("WORD_LANG", "zh")
+    # Words a room remembers across matches so they are not dealt again soon
+    # (capped at half the word pool being dealt from).
+    WORD_RECENT_SIZE = int(os.environ.get("WORD_RECENT_SIZE", "200"))
     CHOOSE_DURATION_SEC = int(os.environ.get("CHOOSE_DURATION_SEC", "12"))
     REVEAL_DURATION_SEC = int(os.environ.get("REVEAL_DURATION_SEC", "6"))
+    EMPTY_ROOM_TTL_SEC = int(os.environ.get("EMPTY_ROOM_TTL_SEC", "10"))
+
+    # Room snapshots: written every SNAPSHOT_INTERVAL_SEC and on SIGTERM, restored
+    # at startup (empty path disables; ROOM_STORE=memory only). Restored players
+    # have SNAPSHOT_REJOIN_GRACE_SEC to reconnect with their playerKey.
+    SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "").strip()
+    SNAPSHOT_INTERVAL_SEC = float(os.environ.get("SNAPSHOT_INTERVAL_SEC", "30"))
+    SNAPSHOT_REJOIN_GRACE_SEC = int(os.environ.get("SNAPSHOT_REJOIN_GRACE_SEC", "60"))
+
+    # Append-only room event log (empty disables), kept in a "worker-<id>"
+    # subdirectory per worker. Serves round replays and fills in what happened
+    # after the last snapshot.
+    EVENT_LOG_DIR = os.environ.get("EVENT_LOG_DIR", "").strip()
+    # Stable across restarts so a worker finds its own log again; defaults to
+    # the listening port (one port per worker), then the process id.
+    WORKER_ID = os.environ.get("WORKER_ID", "").strip() or os.environ.get("PORT", "").strip() or str(os.getpid())
+    EVENT_LOG_SEGMENT_MB = int(os.environ.get("EVENT_LOG_SEGMENT_MB", "64"))
+    EVENT_LOG_MAX_SEGMENTS = int(os.environ.get("EVENT_LOG_MAX_SEGMENTS", "16"))
+    EVENT_LOG_FSYNC = os.environ.get("EVENT_LOG_FSYNC", "0") == "1"
+
+    # Realtime
+    # Per-socket token buckets ("<per second>/<burst>") for client events; each
+    # client IP gets RATE_LIMIT_IP_FACTOR times that. Over-budget chat and
+    # guesses are dropped, draw deltas are deferred and coalesced.
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_CHAT = _budget("RATE_LIMIT_CHAT", "2/6")
+    RATE_LIMIT_GUESS = _budget("RATE_LIMIT_GUESS", "3/8")
+    RATE_LIMIT_DRAW = _budget("RATE_LIMIT_DRAW", "40/80")
+    RATE_LIMIT_IP_FACTOR = float(os.environ.get("RATE_LIMIT_IP_FACTOR", "4"))
+    # Payload caps.
+    SOCKETIO_MAX_PAYLOAD_BYTES = int(os.environ.get("SOCKETIO_MAX_PAYLOAD_BYTES", "1000000"))
+    CHAT_MAX_CHARS = int(os.environ.get("CHAT_MAX_CHARS", "200"))
+    DRAW_MAX_ELEMENTS = int(os.environ.get("DRAW_MAX_ELEMENTS", "500"))
+    DRAW_MAX_POINTS = int(os.environ.get("DRAW_MAX_POINTS", "5000"))
+    # 1 Hz game:tick during countdowns: "auto" only for rooms with a client
+    # that did not announce clockSync on join, "always" or "off".
+    GAME_TICK = os.environ.get("GAME_TICK", "auto").strip().lower()
+    # Socket.IO packet serializer: auto (orjson if installed), json, orjson or
+    # msgpack (clients must be built with VITE_SOCKETIO_PARSER=msgpack).
+    SOCKETIO_SERIALIZER = os.environ.get("SOCKETIO_SERIALIZER", "auto").strip().lower()
+    # Window for coalescing outbound draw deltas per room (0 = send immediately).
+    DRAW_FLUSH_INTERVAL_MS = int(os.environ.get("DRAW_FLUSH_INTERVAL_MS", "33"))
+    # Room state snapshots kept per view for room:state_patch; clients further
+    # behind get a full room:state.
+    STATE_PATCH_HISTORY = int(os.environ.get("STATE_PATCH_HISTORY", "16"))
+    # Store freedraw points quantized and delta-encoded; clients that announce
+    # freedrawCodec on join get that form, others get plain points.
+    FREEDRAW_CODEC = os.environ.get("FREEDRAW_CODEC", "1") == "1"
+    FREEDRAW_PRECISION = float(os.environ.get("FREEDRAW_PRECISION", "0.1"))
+    # Ramer-Douglas-Peucker tolerance in px (0 = keep every point).
+    FREEDRAW_SIMPLIFY_TOLERANCE = float(os.environ.get("FREEDRAW_SIMPLIFY_TOLERANCE", "0"))
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from collections import deque
+from itertools import islice
+
+
+class ChatLog:
+    """Fixed-capacity chat history; every message gets a sequence number.
+
+    Entries are stored as ``(seq, sender, text)`` tuples. The room code is
+    implied by the owning room and added back only when serializing.
+    """
+
+    __slots__ = ("_entries", "seq")
+
+    def __init__(self, capacity: int = 200) -> None:
+        self._entries: deque[tuple[int, str, str]] = deque(maxlen=capacity)
+        self.seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, sender: str, text: str) -> int:
+        self.seq += 1
+        self._entries.append((self.seq, sender, text))
+        return self.seq
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def entries(self) -> list[tuple[int, str, str]]:
+        return list(self._entries)
+
+    def load(self, entries: list, seq: int) -> None:
+        """Replace the history with saved ``entries()`` output, keeping seq numbers."""
+        self._entries.clear()
+        self._entries.extend((int(n), str(sender), str(text)) for n, sender, text in entries)
+        self.seq = max(seq, self._entries[-1][0] if self._entries else 0)
+
+    @staticmethod
+    def _dicts(entries) -> list[dict]:
+        return [{"seq": seq, "from": sender, "text": text} for seq, sender, text in entries]
+
+    def messages(self) -> list[dict]:
+        return self._dicts(self._entries)
+
+    def since(self, seq: int) -> list[dict] | None:
+        """Messages after ``seq``, or None if some of them were already evicted
+        (or ``seq`` is from another log) and the caller needs a full sync."""
+        if seq < 0 or seq > self.seq:
+            return None
+        missing = self.seq - seq
+        if missing > len(self._entries):
+            return None
+        newest_first = list(islice(reversed(self._entries), missing))
+        newest_first.reverse()
+        return self._dicts(newest_first)
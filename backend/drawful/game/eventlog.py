@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from typing import Any, Callable, Iterator
+
+from ..utils.threads import os_threading
+
+# Record: (payload length, crc32 of payload, timestamp ms) then the JSON
+# payload ``[room code, kind, data]``.
+_HEADER = struct.Struct(">IIQ")
+_SUFFIX = ".seg"
+
+Event = tuple[int, str, str, Any]
+
+
+def _segment_ids(directory: str) -> list[int]:
+    ids = []
+    for name in os.listdir(directory):
+        if name.endswith(_SUFFIX) and name[: -len(_SUFFIX)].isdigit():
+            ids.append(int(name[: -len(_SUFFIX)]))
+    return sorted(ids)
+
+
+def read_segment(path: str, offset: int = 0, end: int | None = None) -> Iterator[Event]:
+    """Records of one segment file from ``offset`` up to ``end``, read through mmap.
+
+    Stops at the first torn or corrupt record (e.g. the tail of a crash).
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if end is not None:
+            size = min(size, end)
+        if size <= offset:
+            return
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            pos = offset
+            while pos + _HEADER.size <= size:
+                length, crc, ts = _HEADER.unpack_from(mm, pos)
+                start = pos + _HEADER.size
+                end = start + length
+                if end > size:
+                    return
+                payload = mm[start:end]
+                if zlib.crc32(payload) != crc:
+                    return
+                room_code, kind, data = json.loads(payload)
+                yield ts, room_code, kind, data
+                pos = end
+
+
+class EventLog:
+    """Append-only log of room events, split into numbered segment files.
+
+    ``append`` only queues the event. A background OS thread serializes
+    batches into the active segment. It rolls to a new file past
+    ``segment_bytes`` and deletes the oldest files beyond ``max_segments``.
+    Each process starts a fresh segment, so one directory per worker.
+    Positions of "mark" events (round starts) are kept per room so a round
+    can be replayed without scanning the whole log.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 << 20,
+        max_segments: int = 16,
+        fsync: bool = False,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.fsync = fsync
+        existing = _segment_ids(directory)
+        self._segment_id = existing[-1] if existing else -1
+        self._file = None
+        self._size = 0
+        self._pending: deque[tuple] = deque()
+        real_threading, _ = os_threading()
+        self._wake = real_threading.Event()
+        self._marks_lock = real_threading.Lock()
+        # room code -> (segment id, offset) of its latest mark events.
+        self._marks: dict[str, deque[tuple[int, int]]] = {}
+        self.written = 0
+        self._thread = real_threading.Thread(target=self._run, name="eventlog", daemon=True)
+        self._thread.start()
+
+    def _path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"{segment_id:010d}{_SUFFIX}")
+
+    def append(self, room_code: str, kind: str, data: Any, mark: bool = False) -> None:
+        self._pending.append((int(time.time() * 1000), room_code, kind, data, mark))
+        self._wake.set()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything appended so far is written; False on timeout."""
+        target = self.written + len(self._pending)
+        end = time.monotonic() + timeout
+        while self.written < target:
+            if time.monotonic() >= end:
+                return False
+            self._wake.set()
+            time.sleep(0.01)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(0.5)
+            self._wake.clear()
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception:
+                    # Losing log records must never take the game down.
+                    self.written += len(batch)
+
+    def _roll(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._segment_id += 1
+        self._file = open(self._path(self._segment_id), "ab")
+        self._size = self._file.tell()
+        for old in _segment_ids(self.directory)[: -self.max_segments]:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def _write(self, batch: list[tuple]) -> None:
+        marks = []
+        for ts, room_code, kind, data, mark in batch:
+            payload = json.dumps([room_code, kind, data], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            if self._file is None or self._size >= self.segment_bytes:
+                self._roll()
+            if mark:
+                marks.append((room_code, self._segment_id, self._size))
+            self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload), ts))
+            self._file.write(payload)
+            self._size += _HEADER.size + len(payload)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        # Only published once flushed, so readers always find the record.
+        with self._marks_lock:
+            for room_code, segment_id, offset in marks:
+                self._marks.setdefault(room_code, deque(maxlen=8)).append((segment_id, offset))
+        self.written += len(batch)
+
+    def events(
+        self,
+        start: tuple[int, int] | None = None,
+        since_ms: int = 0,
+        stop: tuple[int, int] | None = None,
+    ) -> Iterator[Event]:
+        """Records from position ``start`` (or the oldest segment) up to ``stop``
+        (exclusive; default the end of the log)."""
+        first_id, offset = start if start is not None else (-1, 0)
+        last_id, end = stop if stop is not None else (None, None)
+        for segment_id in _segment_ids(self.directory):
+            if segment_id < first_id:
+                continue
+            if last_id is not None and segment_id > last_id:
+                return
+            path = self._path(segment_id)
+            if since_ms and os.path.getmtime(path) * 1000 < since_ms:
+                continue
+            for event in read_segment(
+                path,
+                offset if segment_id == first_id else 0,
+                end if segment_id == last_id else None,
+            ):
+                if event[0] >= since_ms:
+                    yield event
+
+    def replay(
+        self, room_code: str, rounds_back: int = 0, pause: Callable[[], None] | None = None
+    ) -> Iterator[Event]:
+        """The room's events from its ``rounds_back``-th latest mark up to the
+        next one, read lazily.
+
+        ``pause`` is called every few hundred records scanned (most belong to
+        other rooms) so a long read can yield to other green threads.
+        """
+        with self._marks_lock:
+            marks = list(self._marks.get(room_code, ()))
+        if rounds_back >= len(marks):
+            return
+        stop = marks[-rounds_back] if rounds_back else None
+        for n, event in enumerate(self.events(marks[-1 - rounds_back], stop=stop), 1):
+            if pause is not None and n % 512 == 0:
+                pause()
+            if event[1] == room_code:
+                yield event
+
+    def forget(self, room_code: str) -> None:
+        with self._marks_lock:
+            self._marks.pop(room_code, None)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+# Compact freedraw form: ``points`` ([[x, y], ...] floats) is replaced by
+# ``pointsDelta`` (flat ints: first point, then per-point deltas) scaled by
+# ``pointsScale``. Everything else in the element is left untouched.
+
+
+def _rdp(points: list[tuple[float, float]], tolerance: float) -> list[int]:
+    """Indexes of the points kept by Ramer-Douglas-Peucker simplification."""
+    n = len(points)
+    if n < 3:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        ax, ay = points[start]
+        bx, by = points[end]
+        dx, dy = bx - ax, by - ay
+        length = math.hypot(dx, dy)
+        far_idx, far_dist = -1, tolerance
+        for i in range(start + 1, end):
+            px, py = points[i]
+            if length:
+                dist = abs(dy * px - dx * py + bx * ay - by * ax) / length
+            else:
+                dist = math.hypot(px - ax, py - ay)
+            if dist > far_dist:
+                far_idx, far_dist = i, dist
+        if far_idx >= 0:
+            keep[far_idx] = True
+            stack.append((start, far_idx))
+            stack.append((far_idx, end))
+    return [i for i in range(n) if keep[i]]
+
+
+def encode_element(el: dict, precision: float = 0.1, tolerance: float = 0.0) -> dict:
+    """Compact copy of a freedraw element; other elements are returned as is."""
+    if el.get("type") != "freedraw":
+        return el
+    raw = el.get("points")
+    if not isinstance(raw, list):
+        return el
+    try:
+        points = [(float(p[0]), float(p[1])) for p in raw]
+    except (TypeError, ValueError, IndexError):
+        return el
+    # inf/NaN (accepted by the JSON parser) cannot be quantized.
+    if not all(math.isfinite(x) and math.isfinite(y) for x, y in points):
+        return el
+
+    out = dict(el)
+    del out["points"]
+    if tolerance > 0 and len(points) > 2:
+        kept = _rdp(points, tolerance)
+        if len(kept) < len(points):
+            points = [points[i] for i in kept]
+            pressures = el.get("pressures")
+            if isinstance(pressures, list) and len(pressures) == len(raw):
+                out["pressures"] = [pressures[i] for i in kept]
+
+    scale = round(1 / precision) if precision > 0 else 1
+    deltas: list[int] = []
+    prev_x = prev_y = 0
+    for x, y in points:
+        qx = round(x * scale)
+        qy = round(y * scale)
+        deltas.append(qx - prev_x)
+        deltas.append(qy - prev_y)
+        prev_x, prev_y = qx, qy
+    out["pointsDelta"] = deltas
+    out["pointsScale"] = scale
+    return out
+
+
+def decode_element(el: dict) -> dict:
+    """Plain Excalidraw copy of an element produced by ``encode_element``."""
+    deltas = el.get("pointsDelta")
+    if deltas is None:
+        return el
+    scale = el.get("pointsScale") or 1
+    out = {k: v for k, v in el.items() if k not in ("pointsDelta", "pointsScale")}
+    points: list[list[float]] = []
+    x = y = 0
+    for i in range(0, len(deltas) - 1, 2):
+        x += deltas[i]
+        y += deltas[i + 1]
+        points.append([x / scale, y / scale])
+    out["points"] = points
+    return out
+
+
+def decode_elements(elements: list[Any]) -> list[Any]:
+    return [decode_element(el) if isinstance(el, dict) else el for el in elements]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Literal
+
+try:  # Optional: pinyin-based near-miss detection.
+    from pypinyin import lazy_pinyin
+except ImportError:  # pragma: no cover
+    lazy_pinyin = None
+
+try:  # Optional: traditional/simplified answer variants.
+    import opencc
+
+    _T2S = opencc.OpenCC("t2s")
+    _S2T = opencc.OpenCC("s2t")
+except ImportError:  # pragma: no cover
+    _T2S = _S2T = None
+
+GuessResult = Literal["correct", "close", "wrong"]
+
+# Everything outside ASCII digits/letters and CJK ideographs (whitespace
+# included) is dropped before comparing guesses with the answer.
+_STRIP_RE = re.compile(r"[^0-9a-z\u4e00-\u9fff]+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# Near-miss checks are skipped for longer guesses to bound the per-message cost.
+_MAX_FUZZY_GUESS = 64
+
+
+def normalize_text(text: str) -> str:
+    return _STRIP_RE.sub("", text.lower())
+
+
+def _max_edits(answer: str) -> int:
+    # Two-character answers use _close_pair instead: one edit away from them
+    # is any message containing one of their characters.
+    n = len(answer)
+    if n <= 2:
+        return 0
+    return 1 if n <= 5 else 2
+
+
+def _close_pair(answer: str, guess: str) -> bool:
+    """Whole two-character guess with one character right, or the pair swapped."""
+    return answer[0] == guess[0] or answer[1] == guess[1] or (answer[0] == guess[1] and answer[1] == guess[0])
+
+
+def _min_substring_distance(peq: dict[str, int], m: int, text: str) -> int:
+    """Smallest edit distance between the pattern and any substring of ``text``.
+
+    Myers' bit-parallel automaton; ``peq`` maps each pattern character to the
+    bitmask of its positions.
+    """
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best = m
+    for c in text:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv
+        if score < best:
+            best = score
+    return best
+
+
+def _pinyin(text: str) -> str:
+    return "".join(lazy_pinyin(text)) if lazy_pinyin is not None else ""
+
+
+class _CompiledWord:
+    __slots__ = ("answers", "fuzzy", "pairs", "pinyin")
+
+    def __init__(self, words: tuple[str, ...]) -> None:
+        variants: set[str] = set()
+        for w in words:
+            variants.add(w)
+            if _T2S is not None:
+                variants.add(_T2S.convert(w))
+                variants.add(_S2T.convert(w))
+        answers = {normalize_text(v) for v in variants}
+        answers.discard("")
+        # Longest first so the common single-answer case exits on the first test.
+        self.answers = tuple(sorted(answers, key=len, reverse=True))
+
+        self.fuzzy: list[tuple[dict[str, int], int, int]] = []
+        for a in self.answers:
+            k = _max_edits(a)
+            if k:
+                peq: dict[str, int] = {}
+                for i, c in enumerate(a):
+                    peq[c] = peq.get(c, 0) | (1 << i)
+                self.fuzzy.append((peq, len(a), k))
+        self.pairs = tuple(a for a in self.answers if len(a) == 2)
+
+        primary = normalize_text(words[0])
+        self.pinyin = _pinyin(primary) if len(primary) >= 2 and _CJK_RE.search(primary) else ""
+
+
+@lru_cache(maxsize=4096)
+def _compile(words: tuple[str, ...]) -> _CompiledWord:
+    return _CompiledWord(words)
+
+
+class AnswerMatcher:
+    """Guess checker for one round's answer, built once when the word is set.
+
+    Compiled answers are shared through a cache, so a word that comes up
+    again (e.g. from the word bank) is not recompiled.
+    """
+
+    __slots__ = ("word", "_compiled")
+
+    def __init__(self, word: str, aliases: list[str] | None = None) -> None:
+        self.word = word
+        self._compiled = _compile((word, *(aliases or [])))
+
+    @property
+    def answers(self) -> tuple[str, ...]:
+        return self._compiled.answers
+
+    def matches(self, text: str) -> bool:
+        return self._match(normalize_text(text))
+
+    def _match(self, t: str) -> bool:
+        return any(a in t for a in self._compiled.answers)
+
+    def classify(self, text: str) -> GuessResult:
+        compiled = self._compiled
+        if not compiled.answers:
+            return "wrong"
+        t = normalize_text(text)
+        if self._match(t):
+            return "correct"
+        if not t or len(t) > _MAX_FUZZY_GUESS:
+            return "wrong"
+        for peq, m, k in compiled.fuzzy:
+            if _min_substring_distance(peq, m, t) <= k:
+                return "close"
+        if len(t) == 2 and any(_close_pair(a, t) for a in compiled.pairs):
+            return "close"
+        if compiled.pinyin and compiled.pinyin in _pinyin(t):
+            return "close"
+        return "wrong"
+
@@ -3,6 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Literal
 
+from ..utils.locks import InstrumentedLock
+from .chatlog import ChatLog
+from .matcher import AnswerMatcher
+from .scene import SceneStore
+from .wordbank import WordSchedule
 
 RoomState = Literal["lobby", "choosing", "playing", "reveal"]
 
@@ -40,8 +45,22 @@ class Room:
     players: dict[str, Player] = field(default_factory=dict)
     player_key_index: dict[str, str] = field(default_factory=dict)
     last_empty_at_ms: int | None = None
-    draw_history: list[dict] = field(default_factory=list)
-    chat_history: list[dict] = field(default_factory=list)
+    # After a restore from snapshot: players not back by then are dropped.
+    rejoin_deadline_ms: int | None = None
+    draw_history: SceneStore = field(default_factory=SceneStore)
+    chat_history: ChatLog = field(default_factory=ChatLog)
     # Admin overrides
     next_word: str | None = None
     next_drawer_id: str | None = None
+    # Bumped on every mutation; keys the cached public snapshots below.
+    version: int = 0
+    state_cache: dict = field(default_factory=dict, repr=False, compare=False)
+    state_history: dict = field(default_factory=dict, repr=False, compare=False)
+    # Normalized form of ``word``; rebuilt whenever the word changes.
+    answer_matcher: AnswerMatcher | None = field(default=None, repr=False, compare=False)
+    # Deals word choices without repeats; process-local like the caches above.
+    word_schedule: WordSchedule | None = field(default=None, repr=False, compare=False)
+    # Nesting depth of _mutating blocks under ``lock`` (see game/service.py).
+    mutation_depth: int = field(default=0, repr=False, compare=False)
+    # Guards every mutation of this room (see game/service.py).
+    lock: InstrumentedLock = field(default_factory=InstrumentedLock, repr=False, compare=False)
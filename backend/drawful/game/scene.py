@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from typing import Any, Callable, Iterable
+
+
+def _is_newer(incoming: dict, current: dict) -> bool:
+    # Same rule as Excalidraw's reconciliation: higher version wins, ties are
+    # broken by the lower versionNonce. Elements without versions always win.
+    v_in = incoming.get("version")
+    v_cur = current.get("version")
+    if not isinstance(v_in, (int, float)) or not isinstance(v_cur, (int, float)):
+        return True
+    if v_in != v_cur:
+        return v_in > v_cur
+
+    n_in = incoming.get("versionNonce")
+    n_cur = current.get("versionNonce")
+    if not isinstance(n_in, (int, float)) or not isinstance(n_cur, (int, float)):
+        return n_in != n_cur
+    return n_in < n_cur
+
+
+class SceneStore:
+    """Ordered id -> element map for the current Excalidraw scene.
+
+    Every accepted change bumps ``seq``; the store remembers which seq last
+    touched each element, and keeps tombstones for evicted ones, so a client
+    that saw the scene at some seq can be sent only what changed since.
+    """
+
+    def __init__(self, capacity: int = 2000) -> None:
+        self.capacity = capacity
+        self._elements: OrderedDict[str, dict] = OrderedDict()
+        # id -> seq of its last change, oldest change first.
+        self._changed: OrderedDict[str, int] = OrderedDict()
+        self._tombstones: deque[tuple[int, str]] = deque(maxlen=capacity)
+        self.seq = 0
+        # Clients older than this need a full resync (board cleared, or
+        # tombstones they would need were dropped).
+        self.base_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    def __iter__(self):
+        return iter(self._elements.values())
+
+    def get(self, element_id: str) -> dict | None:
+        return self._elements.get(element_id)
+
+    def merge(self, elements: Iterable[Any], transform: Callable[[dict], dict] | None = None) -> list[dict]:
+        """Apply last-writer-wins updates; returns the elements that were accepted.
+
+        ``transform`` is applied to accepted elements before they are stored.
+        """
+        accepted: list[dict] = []
+        store = self._elements
+        changed = self._changed
+        for el in elements:
+            if not isinstance(el, dict):
+                continue
+            el_id = el.get("id")
+            if not isinstance(el_id, str) or not el_id:
+                continue
+
+            current = store.get(el_id)
+            if current is not None and not _is_newer(el, current):
+                continue
+
+            if transform is not None:
+                el = transform(el)
+            # Updates keep their z-order slot; new elements go on top.
+            store[el_id] = el
+            self.seq += 1
+            changed[el_id] = self.seq
+            changed.move_to_end(el_id)
+            accepted.append(el)
+
+        while len(store) > self.capacity:
+            evicted_id, _ = store.popitem(last=False)
+            changed.pop(evicted_id, None)
+            self._tombstone(evicted_id)
+
+        return accepted
+
+    def _tombstone(self, element_id: str) -> None:
+        self.seq += 1
+        if len(self._tombstones) == self._tombstones.maxlen:
+            self.base_seq = max(self.base_seq, self._tombstones[0][0])
+        self._tombstones.append((self.seq, element_id))
+
+    def elements(self) -> list[dict]:
+        return list(self._elements.values())
+
+    def since(self, seq: int) -> tuple[list[dict], list[str]] | None:
+        """(changed elements, deleted ids) after ``seq``, in scene order, or
+        None if the caller must resend the whole scene."""
+        if seq < self.base_seq or seq > self.seq:
+            return None
+        ids: list[str] = []
+        for el_id in reversed(self._changed):
+            if self._changed[el_id] <= seq:
+                break
+            ids.append(el_id)
+        if len(ids) > 1:
+            wanted = set(ids)
+            elements = [el for el_id, el in self._elements.items() if el_id in wanted]
+        else:
+            elements = [self._elements[el_id] for el_id in ids]
+        deleted: list[str] = []
+        for t_seq, el_id in reversed(self._tombstones):
+            if t_seq <= seq:
+                break
+            if el_id not in self._elements:
+                deleted.append(el_id)
+        return elements, deleted
+
+    def load(self, elements: list[dict], seq: int) -> None:
+        """Replace the scene with saved elements as of ``seq``.
+
+        Per-element history is not kept, so clients that saw an older seq get a
+        full resync.
+        """
+        self.clear()
+        self.merge(elements)
+        self.seq = max(seq, self.seq)
+        self.base_seq = self.seq
+
+    def clear(self) -> None:
+        self._elements.clear()
+        self._changed.clear()
+        self._tombstones.clear()
+        self.seq += 1
+        self.base_seq = self.seq
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+from threading import Event, Lock
+
+
+class DeadlineScheduler:
+    """Single min-heap of wake-up deadlines keyed by room code.
+
+    Each key has at most one live deadline; ``wake_at`` only ever pulls it
+    earlier. Superseded heap entries are skipped lazily when popped.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._heap: list[tuple[int, int, str]] = []
+        self._due: dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wakeup = Event()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._due)
+
+    def wake_at(self, key: str, at_ms: int) -> None:
+        with self._lock:
+            current = self._due.get(key)
+            if current is not None and current <= at_ms:
+                return
+            self._due[key] = at_ms
+            heapq.heappush(self._heap, (at_ms, next(self._seq), key))
+            if self._heap[0][2] == key:
+                # New earliest deadline: the waiting loop must re-arm.
+                self._wakeup.set()
+
+    def cancel(self, key: str) -> None:
+        with self._lock:
+            self._due.pop(key, None)
+
+    def pop_due(self, now_ms: int) -> list[str]:
+        out: list[str] = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] <= now_ms:
+                at_ms, _, key = heapq.heappop(heap)
+                if self._due.get(key) == at_ms:
+                    del self._due[key]
+                    out.append(key)
+
+            # Drop superseded entries once they dominate the heap.
+            if len(heap) > 64 and len(heap) > 4 * len(self._due):
+                self._heap = [(at, next(self._seq), k) for k, at in self._due.items()]
+                heapq.heapify(self._heap)
+        return out
+
+    def next_due_ms(self) -> int | None:
+        with self._lock:
+            while self._heap:
+                at_ms, _, key = self._heap[0]
+                if self._due.get(key) == at_ms:
+                    return at_ms
+                heapq.heappop(self._heap)
+            return None
+
+    def wait(self, now_ms: int, max_wait_ms: int) -> None:
+        """Block until the earliest deadline, a new earlier deadline, or ``max_wait_ms``."""
+        self._wakeup.clear()
+        nxt = self.next_due_ms()
+        timeout_ms = max_wait_ms if nxt is None else min(max_wait_ms, nxt - now_ms)
+        if timeout_ms <= 0:
+            return
+        self._wakeup.wait(timeout_ms / 1000)
@@ -1,54 +1,306 @@
 from __future__ import annotations
 
+import json
+import os
 import time
 import uuid
-from dataclasses import asdict
-from threading import RLock
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
 
 from ..config import Config
+from ..utils.locks import InstrumentedLock
+from .eventlog import EventLog
+from .freedraw import encode_element
+from .matcher import AnswerMatcher, GuessResult
 from .models import Player, Room
-from .words import DEFAULT_WORDS_ZH, pick_words
+from .scheduler import DeadlineScheduler
+from .snapshot import SnapshotWriter, read_snapshot, room_from_record
+from .statepatch import build_patch
+from .store import create_store
+from .wordbank import WordSchedule, create_word_bank
 
 
 def now_ms() -> int:
     return int(time.time() * 1000)
 
 
-_lock = RLock()
-_rooms: dict[str, Room] = {}
+# Each room carries its own lock; the registry lock only guards inserts into
+# and deletes from the store, so unrelated rooms never block each other.
+_registry_lock = InstrumentedLock("registry")
+# Memory by default; Config.ROOM_STORE="redis" shares rooms between workers.
+_store = create_store()
 
+_word_bank = create_word_bank(Config.WORD_PACKS_DIR)
 
-def create_room(owner_socket_id: str, round_duration_sec: int | None = None) -> Room:
-    with _lock:
-        code = uuid.uuid4().hex
-        while code in _rooms:
-            code = uuid.uuid4().hex
+# Reverse index socket id -> codes of rooms that socket is a player in.
+_player_rooms_lock = Lock()
+_player_rooms: dict[str, set[str]] = {}
+
+
+def _index_player(socket_id: str, code: str) -> None:
+    with _player_rooms_lock:
+        _player_rooms.setdefault(socket_id, set()).add(code)
+
+
+def _unindex_player(socket_id: str, code: str) -> None:
+    with _player_rooms_lock:
+        codes = _player_rooms.get(socket_id)
+        if codes is None:
+            return
+        codes.discard(code)
+        if not codes:
+            del _player_rooms[socket_id]
+
+
+def rooms_for_player(socket_id: str) -> list[Room]:
+    with _player_rooms_lock:
+        codes = list(_player_rooms.get(socket_id, ()))
+    rooms = [_store.get(code) for code in codes]
+    return [r for r in rooms if r is not None]
+
+# Room deadlines (phase timeouts, empty-room TTL) are driven from one shared
+# scheduler instead of a polling task per room.
+deadlines = DeadlineScheduler()
+
+
+# Optional per-worker event log (Config.EVENT_LOG_DIR): joins, draw deltas,
+# chat, guesses and phase transitions, for replays and crash recovery.
+_event_log = (
+    EventLog(
+        os.path.join(Config.EVENT_LOG_DIR, f"worker-{Config.WORKER_ID}"),
+        segment_bytes=Config.EVENT_LOG_SEGMENT_MB << 20,
+        max_segments=Config.EVENT_LOG_MAX_SEGMENTS,
+        fsync=Config.EVENT_LOG_FSYNC,
+    )
+    if Config.EVENT_LOG_DIR
+    else None
+)
+
+
+def log_event(room: Room, kind: str, data: dict, mark: bool = False) -> None:
+    if _event_log is not None:
+        _event_log.append(room.code, kind, data, mark)
+
+
+def replay_round(room: Room, rounds_back: int = 0) -> list[dict] | None:
+    """Logged events of a finished round (0 = the latest one), from the moment
+    drawing started until the next round did; None if the event log is off."""
+    if _event_log is None:
+        return None
+    if room.state == "playing":
+        # The round in progress would give the word away.
+        rounds_back += 1
+    events: list[dict] = []
+    for ts, _, kind, data in _event_log.replay(room.code, rounds_back, pause=lambda: time.sleep(0)):
+        if events and kind == "state" and data.get("state") == "playing":
+            break
+        events.append({"t": ts, "kind": kind, "data": data})
+    return events
+
+
+def _touch(room: Room) -> None:
+    # Must be called (under room.lock) by anything that changes what
+    # room_public_state returns, so cached snapshots get rebuilt.
+    room.version += 1
+
+
+@contextmanager
+def _mutating(room: Room) -> Iterator[None]:
+    # Holds the room lock for a mutation, bumps the version and persists the
+    # room to the store when done. Nested blocks leave saving and logging
+    # state transitions to the outermost one, so a round start is saved once
+    # and marked once.
+    with room.lock:
+        _touch(room)
+        state = room.state
+        room.mutation_depth += 1
+        try:
+            yield
+        finally:
+            room.mutation_depth -= 1
+            if room.mutation_depth == 0:
+                _store.save(room)
+                if room.state != state:
+                    log_event(
+                        room,
+                        "state",
+                        {"state": room.state, "round": room.round, "drawer": room.drawer_id, "word": room.word},
+                        mark=room.state == "playing",
+                    )
+
+
+def touch_room(room: Room) -> None:
+    with _mutating(room):
+        pass
 
-        room = Room(
-            code=code,
-            owner_id=owner_socket_id,
-            round_duration_sec=round_duration_sec or Config.ROUND_DURATION_SEC,
-        )
-        _rooms[code] = room
-        return room
+
+def next_deadline_ms(room: Room) -> int | None:
+    with room.lock:
+        candidates = [
+            room.choose_ends_at_ms if room.state == "choosing" else None,
+            room.round_ends_at_ms if room.state == "playing" else None,
+            room.reveal_ends_at_ms if room.state == "reveal" else None,
+        ]
+        if room.last_empty_at_ms is not None:
+            candidates.append(room.last_empty_at_ms + Config.EMPTY_ROOM_TTL_SEC * 1000)
+        candidates.append(room.rejoin_deadline_ms)
+        pending = [c for c in candidates if c]
+        return min(pending) if pending else None
+
+
+def schedule_room(room: Room) -> None:
+    at_ms = next_deadline_ms(room)
+    if at_ms is not None:
+        deadlines.wake_at(room.code, at_ms)
+
+
+def claim_room_deadlines(room: Room) -> bool:
+    """True if this worker should fire the room's deadlines (always, unless multi-worker)."""
+    return _store.claim_deadlines(room.code, Config.DEADLINE_LEASE_MS)
+
+
+# Rooms changed by another worker are armed here too, so a deadline still
+# fires if the worker that set it goes away.
+if hasattr(_store, "on_load"):
+    _store.on_load = schedule_room
+
+
+def create_room(owner_socket_id: str, round_duration_sec: int | None = None) -> Room:
+    with _registry_lock:
+        while True:
+            room = Room(
+                code=uuid.uuid4().hex,
+                owner_id=owner_socket_id,
+                round_duration_sec=round_duration_sec or Config.ROUND_DURATION_SEC,
+            )
+            if _store.add(room):
+                return room
 
 
 def get_room(code: str) -> Room | None:
-    with _lock:
-        return _rooms.get(code)
+    return _store.get(code)
 
 
 def delete_room(code: str) -> bool:
-    with _lock:
-        if code in _rooms:
-            del _rooms[code]
-            return True
+    with _registry_lock:
+        room = _store.remove(code)
+    if room is None:
         return False
 
+    deadlines.cancel(code)
+    for pid in list(room.players.keys()):
+        _unindex_player(pid, code)
+    _retire_lock_stats(room.lock.stats())
+    if _event_log is not None:
+        _event_log.forget(code)
+    return True
+
 
 def list_rooms() -> list[Room]:
-    with _lock:
-        return list(_rooms.values())
+    with _registry_lock:
+        return _store.all()
+
+
+# Lock counters of deleted rooms, so room lock totals never go down.
+_retired_locks_lock = Lock()
+_retired_locks = {"acquisitions": 0, "contended": 0, "waitMsTotal": 0.0}
+
+
+def _retire_lock_stats(stats: dict) -> None:
+    with _retired_locks_lock:
+        for key in _retired_locks:
+            _retired_locks[key] += stats[key]
+
+
+def lock_stats() -> dict:
+    """Contention counters for the registry lock and every room lock.
+
+    ``retired`` holds the summed counters of rooms deleted so far.
+    """
+    with _retired_locks_lock:
+        retired = dict(_retired_locks)
+    return {
+        "registry": _registry_lock.stats(),
+        "rooms": {r.code: r.lock.stats() for r in list_rooms()},
+        "retired": retired,
+    }
+
+
+if Config.SNAPSHOT_PATH and Config.ROOM_STORE != "memory":
+    # Every worker would dump the shared rooms and restore them as its own.
+    raise ValueError("SNAPSHOT_PATH requires ROOM_STORE=memory")
+_snapshot_writer = SnapshotWriter(Config.SNAPSHOT_PATH) if Config.SNAPSHOT_PATH else None
+
+
+def save_snapshot(cooperative: bool = True) -> int:
+    """Write all rooms to Config.SNAPSHOT_PATH; returns the number of rooms.
+
+    Rooms are copied one at a time under their own lock, never all at once.
+    """
+    if _snapshot_writer is None:
+        return 0
+    pause = (lambda: time.sleep(0)) if cooperative else None
+    return _snapshot_writer.write(list_rooms(), now_ms(), pause)
+
+
+def restore_snapshot() -> list[Room]:
+    """Load rooms saved by save_snapshot, with deadlines moved past the downtime."""
+    path = Config.SNAPSHOT_PATH
+    if not path or not os.path.exists(path):
+        return []
+    taken_at_ms, records = read_snapshot(path)
+    now = now_ms()
+    shift = max(0, now - taken_at_ms)
+    restored: list[Room] = []
+    for data in records:
+        room = room_from_record(data, shift)
+        if room.players:
+            room.rejoin_deadline_ms = now + Config.SNAPSHOT_REJOIN_GRACE_SEC * 1000
+        elif room.last_empty_at_ms is None:
+            room.last_empty_at_ms = now
+        with _registry_lock:
+            if not _store.add(room):
+                continue
+        schedule_room(room)
+        restored.append(room)
+    if _event_log is not None and restored:
+        _replay_after_snapshot({r.code: r for r in restored}, taken_at_ms)
+    return restored
+
+
+def _replay_after_snapshot(rooms: dict[str, Room], taken_at_ms: int) -> None:
+    # Drawing and chat that reached the log after the snapshot was taken.
+    # Merges are last-writer-wins and chat is filtered by seq, so events the
+    # snapshot already holds are harmless.
+    scene_seqs: dict[str, int] = {}
+    for _, code, kind, data in _event_log.events(since_ms=taken_at_ms):
+        room = rooms.get(code)
+        if room is None:
+            continue
+        if kind == "draw":
+            room.draw_history.merge(data["elements"])
+            scene_seqs[code] = max(scene_seqs.get(code, 0), data["seq"])
+        elif kind == "clear":
+            room.draw_history.clear()
+            scene_seqs[code] = max(scene_seqs.get(code, 0), data["seq"])
+        elif kind == "chat" and data["seq"] > room.chat_history.seq:
+            room.chat_history.load(room.chat_history.entries() + [(data["seq"], data["from"], data["text"])], data["seq"])
+    for code, seq in scene_seqs.items():
+        # Seqs assigned while replaying differ from the ones clients saw.
+        scene = rooms[code].draw_history
+        scene.load(scene.elements(), max(seq, scene.seq))
+
+
+def drop_missing_players(room: Room) -> bool:
+    """Remove restored players that did not reconnect in time; True if any were removed."""
+    with _mutating(room):
+        room.rejoin_deadline_ms = None
+        missing = [pid for pid, p in room.players.items() if not p.connected]
+    for pid in missing:
+        remove_player(room, pid)
+    return bool(missing)
 
 
 def upsert_player(
@@ -58,7 +310,7 @@ def upsert_player(
     avatar: str = "",
     player_key: str = "",
 ) -> Player:
-    with _lock:
+    with _mutating(room):
         # Any join cancels pending empty-room TTL.
         room.last_empty_at_ms = None
 
@@ -73,6 +325,7 @@ def upsert_player(
                     # Preserve score and migrate stateful references.
                     preserved_score = old_player.score
                     del room.players[old_sid]
+                    _unindex_player(old_sid, room.code)
 
                     if room.owner_id == old_sid:
                         room.owner_id = socket_id
@@ -118,11 +371,13 @@ def upsert_player(
         if pk:
             room.player_key_index[pk] = socket_id
 
+        _index_player(socket_id, room.code)
+        log_event(room, "join", {"player": socket_id, "name": name})
         return player
 
 
 def remove_player(room: Room, socket_id: str) -> None:
-    with _lock:
+    with _mutating(room):
         # Clear playerKey index if present.
         try:
             pk = room.players.get(socket_id).player_key if socket_id in room.players else ""
@@ -133,6 +388,8 @@ def remove_player(room: Room, socket_id: str) -> None:
 
         if socket_id in room.players:
             del room.players[socket_id]
+            log_event(room, "leave", {"player": socket_id})
+        _unindex_player(socket_id, room.code)
 
         try:
             if socket_id in room.match_abort_votes:
@@ -142,6 +399,7 @@ def remove_player(room: Room, socket_id: str) -> None:
 
         if not room.players:
             room.last_empty_at_ms = now_ms()
+            schedule_room(room)
 
         if room.owner_id == socket_id:
             # Assign a new owner if possible
@@ -151,7 +409,7 @@ def remove_player(room: Room, socket_id: str) -> None:
 
 
 def set_round_duration(room: Room, duration_sec: int) -> bool:
-    with _lock:
+    with _mutating(room):
         if not isinstance(duration_sec, int):
             return False
         if duration_sec < 10 or duration_sec > 300:
@@ -162,12 +420,13 @@ def set_round_duration(room: Room, duration_sec: int) -> bool:
         # If a round is already running, apply immediately.
         if room.state == "playing" and room.started_at_ms:
             room.round_ends_at_ms = room.started_at_ms + (room.round_duration_sec * 1000)
+            schedule_room(room)
 
         return True
 
 
 def transfer_owner(room: Room, new_owner_socket_id: str) -> bool:
-    with _lock:
+    with _mutating(room):
         if not new_owner_socket_id:
             return False
         if new_owner_socket_id not in room.players:
@@ -176,61 +435,203 @@ def transfer_owner(room: Room, new_owner_socket_id: str) -> bool:
         return True
 
 
+def _build_public_state(room: Room) -> dict:
+    # Do NOT expose player_key to other clients.
+    players = [
+        {"id": p.id, "name": p.name, "avatar": p.avatar, "score": p.score, "connected": p.connected}
+        for p in room.players.values()
+    ]
+    total_players = max(0, len(room.players))
+    # Abort needs >3/5 of players to agree.
+    abort_needed = int((3 * total_players) / 5) + 1 if total_players > 0 else 0
+    word_hint = None
+    if room.word:
+        word_hint = "_" * len(room.word)
+
+    payload = {
+        "code": room.code,
+        "version": room.version,
+        "view": "public",
+        "ownerId": room.owner_id,
+        "state": room.state,
+        "round": room.round,
+        "roundsPerMatch": getattr(room, "rounds_per_match", 3),
+        "matchRoundIndex": getattr(room, "match_round_index", 0),
+        "drawerId": room.drawer_id,
+        "roundDurationSec": room.round_duration_sec,
+        "startedAtMs": room.started_at_ms,
+        "chooseEndsAtMs": room.choose_ends_at_ms,
+        "roundEndsAtMs": room.round_ends_at_ms,
+        "revealEndsAtMs": room.reveal_ends_at_ms,
+        "players": players,
+        "wordHint": word_hint,
+        "abortVotesCount": len(room.abort_votes),
+        "abortVotesNeeded": abort_needed,
+        "matchAbortVotesCount": len(getattr(room, "match_abort_votes", set())),
+        "matchAbortVotesNeeded": abort_needed,
+    }
+
+    if room.state == "reveal" and room.word:
+        payload["word"] = room.word
+
+    return payload
+
+
+def _build_drawer_state(room: Room) -> dict:
+    payload = dict(_cached_state(room, "public"))
+    payload["view"] = "drawer"
+    if room.word:
+        payload["word"] = room.word
+    if room.state == "choosing" and room.word_choices:
+        payload["wordChoices"] = list(room.word_choices)
+    return payload
+
+
+_STATE_BUILDERS = {
+    "public": _build_public_state,
+    "drawer": _build_drawer_state,
+}
+
+
+def _cached_state(room: Room, view: str) -> dict:
+    cache = room.state_cache
+    if cache.get("version") != room.version:
+        cache.clear()
+        cache["version"] = room.version
+    payload = cache.get(view)
+    if payload is None:
+        payload = cache[view] = _STATE_BUILDERS[view](room)
+
+        # Keep recent snapshots per view so clients can be sent patches.
+        history = room.state_history.get(view)
+        if history is None:
+            history = room.state_history[view] = deque(maxlen=Config.STATE_PATCH_HISTORY)
+        history.append(payload)
+    return payload
+
+
+def _state_view(room: Room, viewer_socket_id: str | None) -> str:
+    if viewer_socket_id and viewer_socket_id == room.drawer_id:
+        return "drawer"
+    return "public"
+
+
 def room_public_state(room: Room, viewer_socket_id: str | None = None) -> dict:
-    with _lock:
-        # Do NOT expose player_key to other clients.
-        players = []
-        for p in room.players.values():
-            d = asdict(p)
-            d.pop("player_key", None)
-            players.append(d)
-        total_players = max(0, len(room.players))
-        # Abort needs >3/5 of players to agree.
-        abort_needed = int((3 * total_players) / 5) + 1 if total_players > 0 else 0
-        word_hint = None
-        if room.word:
-            word_hint = "_" * len(room.word)
-
-        payload = {
-            "code": room.code,
-            "ownerId": room.owner_id,
-            "state": room.state,
-            "round": room.round,
-            "roundsPerMatch": getattr(room, "rounds_per_match", 3),
-            "matchRoundIndex": getattr(room, "match_round_index", 0),
-            "drawerId": room.drawer_id,
-            "roundDurationSec": room.round_duration_sec,
-            "startedAtMs": room.started_at_ms,
-            "chooseEndsAtMs": room.choose_ends_at_ms,
-            "roundEndsAtMs": room.round_ends_at_ms,
-            "revealEndsAtMs": room.reveal_ends_at_ms,
-            "players": players,
-            "wordHint": word_hint,
-            "abortVotesCount": len(room.abort_votes),
-            "abortVotesNeeded": abort_needed,
-            "matchAbortVotesCount": len(getattr(room, "match_abort_votes", set())),
-            "matchAbortVotesNeeded": abort_needed,
-        }
-
-        if room.state == "reveal" and room.word:
-            payload["word"] = room.word
-
-        if viewer_socket_id and viewer_socket_id == room.drawer_id:
-            if room.word:
-                payload["word"] = room.word
-            if room.state == "choosing" and room.word_choices:
-                payload["wordChoices"] = list(room.word_choices)
-
-        return payload
-
-
-def get_word_choices(count: int | None = None, custom_words: list[str] | None = None) -> list[str]:
-    words = (custom_words or []) + DEFAULT_WORDS_ZH
-    return pick_words(words, count or Config.WORD_CHOICES_COUNT)
+    """Snapshot of the room as seen by ``viewer_socket_id``.
+
+    Memoized per (room.version, view); callers must treat it as read-only.
+    """
+    with room.lock:
+        return _cached_state(room, _state_view(room, viewer_socket_id))
+
+
+def room_state_view(room: Room, viewer_socket_id: str | None) -> str:
+    with room.lock:
+        return _state_view(room, viewer_socket_id)
+
+
+def room_state_patch(room: Room, base_version: int, viewer_socket_id: str | None = None) -> dict | None:
+    """Patch from ``base_version`` to the current state, or None if a full state must be sent."""
+    with room.lock:
+        view = _state_view(room, viewer_socket_id)
+        current = _cached_state(room, view)
+        key = f"{view}:patch:{base_version}"
+        patch = room.state_cache.get(key)
+        if patch is not None:
+            return patch
+
+        snapshots = list(room.state_history.get(view, ()))
+        start = next((i for i, snap in enumerate(snapshots) if snap["version"] == base_version), None)
+        if start is None or snapshots[-1] is not current:
+            return None
+
+        patch = build_patch(snapshots[start:])
+        patch.update({"code": room.code, "view": view, "baseVersion": base_version, "version": room.version})
+        room.state_cache[key] = patch
+        return patch
+
+
+def room_public_state_json(room: Room, viewer_socket_id: str | None = None) -> bytes:
+    with room.lock:
+        view = _state_view(room, viewer_socket_id)
+        payload = _cached_state(room, view)
+        key = view + ":json"
+        body = room.state_cache.get(key)
+        if body is None:
+            body = room.state_cache[key] = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return body
+
+
+def _encode_freedraw(el: dict) -> dict:
+    return encode_element(el, Config.FREEDRAW_PRECISION, Config.FREEDRAW_SIMPLIFY_TOLERANCE)
+
+
+def apply_draw_change(room: Room, elements: list) -> tuple[list[dict], int]:
+    """Merge elements into the scene; returns (accepted, scene seq after the merge)."""
+    with room.lock:
+        accepted = room.draw_history.merge(elements, transform=_encode_freedraw if Config.FREEDRAW_CODEC else None)
+        if accepted:
+            log_event(room, "draw", {"seq": room.draw_history.seq, "elements": accepted})
+        return accepted, room.draw_history.seq
+
+
+def draw_elements(room: Room) -> list[dict]:
+    with room.lock:
+        return room.draw_history.elements()
+
+
+def draw_seq(room: Room) -> int:
+    with room.lock:
+        return room.draw_history.seq
+
+
+def draw_sync(room: Room, since_seq: int | None = None) -> dict:
+    """Scene for a (re)joining client: only changes after ``since_seq`` when the
+    store can still tell what those were, otherwise everything."""
+    with room.lock:
+        scene = room.draw_history
+        delta = scene.since(since_seq) if since_seq is not None else None
+        if delta is None:
+            return {"elements": scene.elements(), "seq": scene.seq, "reset": True}
+        elements, deleted = delta
+        return {"elements": elements, "deleted": deleted, "seq": scene.seq, "incremental": True}
+
+
+def clear_drawing(room: Room) -> int:
+    with room.lock:
+        room.draw_history.clear()
+        log_event(room, "clear", {"seq": room.draw_history.seq})
+        return room.draw_history.seq
+
+
+def get_word_choices(
+    count: int | None = None,
+    custom_words: list[str] | None = None,
+    lang: str | None = None,
+    category: str | None = None,
+    difficulty: int | None = None,
+) -> list[str]:
+    return _word_bank.sample(
+        count or Config.WORD_CHOICES_COUNT,
+        lang=lang or Config.WORD_LANG,
+        category=category,
+        difficulty=difficulty,
+        extra=custom_words,
+    )
+
+
+def _deal_words(room: Room, count: int | None = None) -> list[str]:
+    if room.word_schedule is None:
+        room.word_schedule = WordSchedule(_word_bank, Config.WORD_RECENT_SIZE)
+    return room.word_schedule.take(
+        count or Config.WORD_CHOICES_COUNT,
+        lang=Config.WORD_LANG,
+        extra=room.custom_words,
+    )
 
 
 def start_choosing(room: Room, custom_words: list[str] | None = None) -> None:
-    with _lock:
+    with _mutating(room):
         room.state = "choosing"
         room.round += 1
         room.started_at_ms = None
@@ -242,8 +643,9 @@ def start_choosing(room: Room, custom_words: list[str] | None = None) -> None:
 
         room.custom_words = list(custom_words or [])
         room.word = None
-        room.word_choices = get_word_choices(custom_words=room.custom_words)
+        room.word_choices = _deal_words(room)
         room.choose_ends_at_ms = now_ms() + (Config.CHOOSE_DURATION_SEC * 1000)
+        schedule_room(room)
 
         # drawer rotation
         player_ids = list(room.players.keys())
@@ -269,6 +671,9 @@ def start_choosing(room: Room, custom_words: list[str] | None = None) -> None:
 def _start_playing_locked(room: Room, word: str) -> None:
     room.state = "playing"
     room.word = word
+    room.answer_matcher = AnswerMatcher(word)
+    if room.word_schedule is not None:
+        room.word_schedule.remember(word)
     room.word_choices = []
     room.choose_ends_at_ms = None
     room.started_at_ms = now_ms()
@@ -278,10 +683,11 @@ def _start_playing_locked(room: Room, word: str) -> None:
     room.abort_votes = set()
     room.next_word = None
     room.next_drawer_id = None
+    schedule_room(room)
 
 
 def choose_word(room: Room, chooser_socket_id: str, word: str) -> bool:
-    with _lock:
+    with _mutating(room):
         if room.state != "choosing":
             return False
         if chooser_socket_id != room.drawer_id:
@@ -298,17 +704,18 @@ def choose_word(room: Room, chooser_socket_id: str, word: str) -> bool:
 
 
 def reveal_round(room: Room) -> None:
-    with _lock:
+    with _mutating(room):
         room.state = "reveal"
         room.choose_ends_at_ms = None
         room.round_ends_at_ms = None
         room.reveal_ends_at_ms = now_ms() + (Config.REVEAL_DURATION_SEC * 1000)
         room.abort_votes = set()
         room.match_abort_votes = set()
+        schedule_room(room)
 
 
 def reset_to_lobby(room: Room) -> None:
-    with _lock:
+    with _mutating(room):
         room.state = "lobby"
         room.word = None
         room.word_choices = []
@@ -322,7 +729,7 @@ def reset_to_lobby(room: Room) -> None:
 
 
 def set_rounds_per_match(room: Room, rounds_per_match: int) -> bool:
-    with _lock:
+    with _mutating(room):
         if not isinstance(rounds_per_match, int):
             return False
         if rounds_per_match < 1 or rounds_per_match > 20:
@@ -334,13 +741,13 @@ def set_rounds_per_match(room: Room, rounds_per_match: int) -> bool:
 
 
 def start_match(room: Room, custom_words: list[str] | None = None) -> None:
-    with _lock:
+    with _mutating(room):
         room.match_round_index = 1
     start_round(room, custom_words=custom_words)
 
 
 def advance_after_reveal(room: Room) -> bool:
-    with _lock:
+    with _mutating(room):
         rpm = getattr(room, "rounds_per_match", 3)
         idx = getattr(room, "match_round_index", 0)
         if idx <= 0:
@@ -357,7 +764,7 @@ def advance_after_reveal(room: Room) -> bool:
 
 
 def abort_round(room: Room) -> None:
-    with _lock:
+    with _mutating(room):
         if room.state not in ("choosing", "playing"):
             return
         # Go to reveal immediately.
@@ -367,27 +774,62 @@ def abort_round(room: Room) -> None:
         room.reveal_ends_at_ms = now_ms() + (Config.REVEAL_DURATION_SEC * 1000)
         room.abort_votes = set()
         room.match_abort_votes = set()
+        schedule_room(room)
 
 
 def abort_match(room: Room) -> None:
-    with _lock:
+    with _mutating(room):
         reset_to_lobby(room)
 
 
+def _answer_matcher(room: Room) -> AnswerMatcher | None:
+    word = room.word
+    if not word:
+        return None
+    matcher = room.answer_matcher
+    if matcher is None or matcher.word != word:
+        # Word set outside _start_playing_locked (e.g. loaded from Redis).
+        matcher = room.answer_matcher = AnswerMatcher(word)
+    return matcher
+
+
+def is_answer(room: Room, text: str) -> bool:
+    """Whether ``text`` contains the room's current answer."""
+    matcher = _answer_matcher(room)
+    return matcher is not None and matcher.matches(text)
+
+
+def classify_guess(room: Room, text: str) -> GuessResult:
+    """"correct", "close" (near miss worth a private hint) or "wrong"."""
+    matcher = _answer_matcher(room)
+    return matcher.classify(text) if matcher is not None else "wrong"
+
+
+def record_correct_guess(room: Room, guesser_socket_id: str) -> bool:
+    """Scores a correct guess; returns False if this player already guessed it this round."""
+    with room.lock:
+        if guesser_socket_id in room.correct_guessers:
+            return False
+        with _mutating(room):
+            scored = _store.record_guess(room, guesser_socket_id, guesser_points=10, drawer_points=5)
+            if scored:
+                log_event(room, "guess", {"player": guesser_socket_id})
+            return scored
+
+
 def add_abort_vote(room: Room, voter_socket_id: str) -> tuple[int, int, bool]:
     """Returns (votes_count, votes_needed, aborted)."""
-    with _lock:
+    with _mutating(room):
         if room.state not in ("choosing", "playing"):
             return 0, 0, False
 
         if voter_socket_id not in room.players:
             return len(room.abort_votes), 0, False
 
-        room.abort_votes.add(voter_socket_id)
+        votes = _store.add_vote(room, "abort", voter_socket_id)
 
         total_players = max(0, len(room.players))
         needed = int((3 * total_players) / 5) + 1 if total_players > 0 else 0
-        votes = len(room.abort_votes)
 
         if needed > 0 and votes >= needed:
             # Abort the round
@@ -397,6 +839,7 @@ def add_abort_vote(room: Room, voter_socket_id: str) -> tuple[int, int, bool]:
             room.reveal_ends_at_ms = now_ms() + (Config.REVEAL_DURATION_SEC * 1000)
             room.abort_votes = set()
             room.match_abort_votes = set()
+            schedule_room(room)
             return votes, needed, True
 
         return votes, needed, False
@@ -404,18 +847,17 @@ def add_abort_vote(room: Room, voter_socket_id: str) -> tuple[int, int, bool]:
 
 def add_match_abort_vote(room: Room, voter_socket_id: str) -> tuple[int, int, bool]:
     """Returns (votes_count, votes_needed, aborted)."""
-    with _lock:
+    with _mutating(room):
         if room.state not in ("choosing", "playing", "reveal"):
             return 0, 0, False
 
         if voter_socket_id not in room.players:
             return len(room.match_abort_votes), 0, False
 
-        room.match_abort_votes.add(voter_socket_id)
+        votes = _store.add_vote(room, "match", voter_socket_id)
 
         total_players = max(0, len(room.players))
         needed = int((3 * total_players) / 5) + 1 if total_players > 0 else 0
-        votes = len(room.match_abort_votes)
 
         if needed > 0 and votes >= needed:
             reset_to_lobby(room)
@@ -425,7 +867,7 @@ def add_match_abort_vote(room: Room, voter_socket_id: str) -> tuple[int, int, bo
 
 
 def auto_choose_if_needed(room: Room) -> None:
-    with _lock:
+    with _mutating(room):
         if room.state != "choosing":
             return
 
@@ -433,8 +875,8 @@ def auto_choose_if_needed(room: Room) -> None:
             _start_playing_locked(room, word=room.word_choices[0])
             return
 
-        # Fallback (should not happen because DEFAULT_WORDS_ZH is non-empty)
-        _start_playing_locked(room, word=pick_words(DEFAULT_WORDS_ZH, 1)[0])
+        # Fallback (should not happen because the default bank is non-empty)
+        _start_playing_locked(room, word=_deal_words(room, 1)[0])
 
 
 def start_round(room: Room, custom_words: list[str] | None = None) -> None:
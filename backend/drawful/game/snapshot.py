@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import threading
+import zlib
+from typing import Callable, Iterable, Iterator
+
+from .models import Player, Room
+from .store import _LISTS, _SCALARS, _SETS
+
+# File layout: magic, then (taken at ms, room count), then per room a
+# length-prefixed zlib-compressed JSON record.
+_MAGIC = b"DRWSNAP1"
+_HEADER = struct.Struct(">QI")
+_LENGTH = struct.Struct(">I")
+
+# Absolute timestamps moved forward by the downtime on restore.
+_DEADLINES = ("started_at_ms", "choose_ends_at_ms", "round_ends_at_ms", "reveal_ends_at_ms", "last_empty_at_ms")
+
+
+def room_record(room: Room) -> dict:
+    """Plain-data copy of a room; call with ``room.lock`` held."""
+    data: dict = {"c": room.code, "v": room.version}
+    for short, (attr, _) in _SCALARS.items():
+        value = getattr(room, attr)
+        if value is not None:
+            data[short] = value
+    for short, attr in _LISTS.items():
+        data[short] = list(getattr(room, attr))
+    for short, attr in _SETS.items():
+        data[short] = list(getattr(room, attr))
+    data["p"] = [[p.id, p.name, p.avatar, p.score, p.player_key] for p in room.players.values()]
+    data["k"] = dict(room.player_key_index)
+    data["ds"] = room.draw_history.seq
+    data["de"] = room.draw_history.elements()
+    data["cs"] = room.chat_history.seq
+    data["cm"] = room.chat_history.entries()
+    return data
+
+
+def room_from_record(data: dict, shift_ms: int = 0) -> Room:
+    """Rebuild a room; every restored player starts out disconnected."""
+    room = Room(code=data["c"], owner_id=data.get("o", ""))
+    for short, (attr, kind) in _SCALARS.items():
+        value = data.get(short)
+        setattr(room, attr, kind(value) if value is not None else None)
+    for short, attr in _LISTS.items():
+        setattr(room, attr, list(data.get(short, ())))
+    for short, attr in _SETS.items():
+        setattr(room, attr, set(data.get(short, ())))
+    for attr in _DEADLINES:
+        value = getattr(room, attr)
+        if value is not None:
+            setattr(room, attr, value + shift_ms)
+
+    for pid, name, avatar, score, player_key in data.get("p", ()):
+        room.players[pid] = Player(id=pid, name=name, avatar=avatar, score=score, connected=False, player_key=player_key)
+    room.player_key_index = {k: v for k, v in data.get("k", {}).items() if v in room.players}
+    room.draw_history.load(data.get("de", []), data.get("ds", 0))
+    room.chat_history.load(data.get("cm", []), data.get("cs", 0))
+
+    room.owner_id = room.owner_id or ""
+    room.state = room.state or "lobby"
+    room.version = int(data.get("v", 0))
+    return room
+
+
+class SnapshotWriter:
+    """Writes room snapshots, re-encoding only rooms that changed.
+
+    Each room's compressed record is cached with the room version and the
+    scene/chat seqs it was built from; an unchanged room is copied from the
+    cache without taking its lock.
+    """
+
+    def __init__(self, path: str, level: int = 6) -> None:
+        self.path = path
+        self.level = level
+        self._records: dict[str, tuple[tuple[int, int, int], bytes]] = {}
+        self.encoded = 0
+        self.reused = 0
+
+    def _record(self, room: Room) -> bytes:
+        key = (room.version, room.draw_history.seq, room.chat_history.seq)
+        cached = self._records.get(room.code)
+        if cached is not None and cached[0] == key:
+            self.reused += 1
+            return cached[1]
+        with room.lock:
+            key = (room.version, room.draw_history.seq, room.chat_history.seq)
+            data = room_record(room)
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), self.level)
+        self._records[room.code] = (key, blob)
+        self.encoded += 1
+        return blob
+
+    def write(self, rooms: Iterable[Room], taken_at_ms: int, pause: Callable[[], None] | None = None) -> int:
+        """Atomically replace the snapshot file; returns the number of rooms.
+
+        ``pause`` is called every few re-encoded rooms so a large dump can
+        yield to other green threads.
+        """
+        rooms = list(rooms)
+        live = {room.code for room in rooms}
+        for code in [c for c in self._records if c not in live]:
+            del self._records[code]
+
+        # Per-thread temp file: the SIGTERM dump may interrupt a periodic one.
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(taken_at_ms, len(rooms)))
+            for room in rooms:
+                before = self.encoded
+                blob = self._record(room)
+                if pause is not None and self.encoded != before and self.encoded % 64 == 0:
+                    pause()
+                f.write(_LENGTH.pack(len(blob)))
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        return len(rooms)
+
+
+def read_snapshot(path: str) -> tuple[int, Iterator[dict]]:
+    """(taken at ms, room records) from a snapshot file."""
+    f = open(path, "rb")
+    if f.read(len(_MAGIC)) != _MAGIC:
+        f.close()
+        raise ValueError(f"not a room snapshot: {path}")
+    taken_at_ms, count = _HEADER.unpack(f.read(_HEADER.size))
+
+    def records() -> Iterator[dict]:
+        with f:
+            for _ in range(count):
+                (size,) = _LENGTH.unpack(f.read(_LENGTH.size))
+                yield json.loads(zlib.decompress(f.read(size)))
+
+    return taken_at_ms, records()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+_MISSING = object()
+
+
+def _players_by_id(snapshot: dict) -> dict[str, dict]:
+    return {p["id"]: p for p in snapshot.get("players", [])}
+
+
+def build_patch(snapshots: list[dict]) -> dict:
+    """Patch that brings a client holding any of ``snapshots`` up to ``snapshots[-1]``.
+
+    ``snapshots`` are consecutive public-state snapshots, oldest first. Fields
+    and players that changed at any step are included with their current
+    value, so a client that already applied some intermediate patch still
+    converges on the latest state.
+    """
+    changed_keys: set[str] = set()
+    changed_players: set[str] = set()
+
+    for prev, nxt in zip(snapshots, snapshots[1:]):
+        for key in prev.keys() | nxt.keys():
+            if key == "players":
+                continue
+            if prev.get(key, _MISSING) != nxt.get(key, _MISSING):
+                changed_keys.add(key)
+
+        prev_players = _players_by_id(prev)
+        nxt_players = _players_by_id(nxt)
+        for pid in prev_players.keys() | nxt_players.keys():
+            if prev_players.get(pid) != nxt_players.get(pid):
+                changed_players.add(pid)
+
+    current = snapshots[-1]
+    current_players = current.get("players", [])
+    current_ids = {p["id"] for p in current_players}
+
+    return {
+        "set": {k: current[k] for k in changed_keys if k in current},
+        "unset": sorted(k for k in changed_keys if k not in current),
+        "players": [p for p in current_players if p["id"] in changed_players],
+        "removedPlayers": sorted(pid for pid in changed_players if pid not in current_ids),
+    }
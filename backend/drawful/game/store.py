@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import Any
+
+from ..config import Config
+from .models import Player, Room
+
+
+class MemoryRoomStore:
+    """Process-local room storage (the default)."""
+
+    def __init__(self) -> None:
+        self._rooms: dict[str, Room] = {}
+
+    def get(self, code: str) -> Room | None:
+        return self._rooms.get(code)
+
+    def add(self, room: Room) -> bool:
+        if room.code in self._rooms:
+            return False
+        self._rooms[room.code] = room
+        return True
+
+    def remove(self, code: str) -> Room | None:
+        return self._rooms.pop(code, None)
+
+    def all(self) -> list[Room]:
+        return list(self._rooms.values())
+
+    def save(self, room: Room) -> None:
+        pass
+
+    def claim_deadlines(self, code: str, ttl_ms: int) -> bool:
+        # Single process: this worker always owns every room's deadlines.
+        return True
+
+    def add_vote(self, room: Room, kind: str, voter_socket_id: str) -> int:
+        votes = room.abort_votes if kind == "abort" else room.match_abort_votes
+        votes.add(voter_socket_id)
+        return len(votes)
+
+    def record_guess(self, room: Room, guesser_socket_id: str, guesser_points: int, drawer_points: int) -> bool:
+        if guesser_socket_id in room.correct_guessers:
+            return False
+        room.correct_guessers.add(guesser_socket_id)
+        if guesser_socket_id in room.players:
+            room.players[guesser_socket_id].score += guesser_points
+        if room.drawer_id and room.drawer_id in room.players:
+            room.players[room.drawer_id].score += drawer_points
+        return True
+
+
+# Scalar Room attributes stored in the room hash, keyed by short field names
+# so small rooms stay in Redis' compact listpack encoding.
+_SCALARS: dict[str, tuple[str, type]] = {
+    "o": ("owner_id", str),
+    "s": ("state", str),
+    "r": ("round", int),
+    "rpm": ("rounds_per_match", int),
+    "mri": ("match_round_index", int),
+    "d": ("drawer_id", str),
+    "w": ("word", str),
+    "sa": ("started_at_ms", int),
+    "ce": ("choose_ends_at_ms", int),
+    "re": ("round_ends_at_ms", int),
+    "ve": ("reveal_ends_at_ms", int),
+    "rd": ("round_duration_sec", int),
+    "le": ("last_empty_at_ms", int),
+    "rj": ("rejoin_deadline_ms", int),
+    "nw": ("next_word", str),
+    "nd": ("next_drawer_id", str),
+}
+_LISTS = {"wc": "word_choices", "cw": "custom_words"}
+_SETS = {"ab": "abort_votes", "mab": "match_abort_votes", "cg": "correct_guessers"}
+
+# KEYS: votes set. ARGV: voter id. Returns the members after adding.
+_VOTE_LUA = """
+redis.call('SADD', KEYS[1], ARGV[1])
+return redis.call('SMEMBERS', KEYS[1])
+"""
+
+# KEYS: correct-guessers set, scores hash, players hash. ARGV: guesser, drawer
+# ('' if none), guesser points, drawer points. Only players score. Returns
+# {added, guesser score, drawer score}.
+_GUESS_LUA = """
+if redis.call('SADD', KEYS[1], ARGV[1]) == 0 then
+  return {0, 0, 0}
+end
+local g = 0
+if redis.call('HEXISTS', KEYS[3], ARGV[1]) == 1 then
+  g = redis.call('HINCRBY', KEYS[2], ARGV[1], ARGV[3])
+end
+local d = 0
+if ARGV[2] ~= '' and redis.call('HEXISTS', KEYS[3], ARGV[2]) == 1 then
+  d = redis.call('HINCRBY', KEYS[2], ARGV[2], ARGV[4])
+end
+return {1, g, d}
+"""
+
+
+# KEYS: lease key. ARGV: owner id, ttl ms. Returns 1 if ARGV[1] holds the lease.
+_LEASE_LUA = """
+local holder = redis.call('GET', KEYS[1])
+if holder == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  return 1
+end
+if not holder and redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+  return 1
+end
+return 0
+"""
+
+# KEYS: room hash. ARGV: local version. Returns a version newer than both the
+# stored and the local one, so it stays monotonic across workers.
+_BUMP_LUA = """
+local v = redis.call('HINCRBY', KEYS[1], 'v', 1)
+local floor = tonumber(ARGV[1])
+if v < floor then
+  redis.call('HSET', KEYS[1], 'v', floor)
+  v = floor
+end
+return v
+"""
+
+
+def _s(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _encode(room: Room) -> dict:
+    """Stored form of a room: room hash fields ("h"), players ("p"), scores
+    ("sc") and one member set per _SETS key."""
+    fields: dict[str, str] = {}
+    for short, (attr, _) in _SCALARS.items():
+        value = getattr(room, attr)
+        if value is not None:
+            fields[short] = str(value)
+    for short, attr in _LISTS.items():
+        value = getattr(room, attr)
+        if value:
+            fields[short] = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    data: dict = {
+        "h": fields,
+        "p": {
+            pid: json.dumps([p.name, p.avatar, int(p.connected), p.player_key], ensure_ascii=False, separators=(",", ":"))
+            for pid, p in room.players.items()
+        },
+        "sc": {pid: p.score for pid, p in room.players.items()},
+    }
+    for short, attr in _SETS.items():
+        data[short] = set(getattr(room, attr))
+    return data
+
+
+def _empty() -> dict:
+    return {"h": {}, "p": {}, "sc": {}, **{short: set() for short in _SETS}}
+
+
+class RedisRoomStore:
+    """Room storage shared through Redis.
+
+    Live Room objects are cached per process and re-read whenever the version
+    stored in Redis moves past the cached one, so several workers can serve
+    the same room. ``save`` writes only what changed since the room was last
+    loaded or saved, so workers saving the same room at once keep each
+    other's changes. Drawing scenes, chat and other caches stay
+    process-local. Works with any redis-py compatible client (e.g. fakeredis
+    with Lua).
+    """
+
+    def __init__(self, client: Any, prefix: str = "drawful") -> None:
+        self._r = client
+        self._prefix = prefix
+        self._cache: dict[str, Room] = {}
+        # code -> (stored version, _encode() output) as of the last load or save.
+        self._synced: dict[str, tuple[int, dict]] = {}
+        self._vote = client.register_script(_VOTE_LUA)
+        self._guess = client.register_script(_GUESS_LUA)
+        self._bump = client.register_script(_BUMP_LUA)
+        self._lease = client.register_script(_LEASE_LUA)
+        self._owner_pid = 0
+        self._owner = ""
+        # Called with every Room (re)loaded from Redis, e.g. to arm its deadlines.
+        self.on_load = None
+
+    def _key(self, code: str, part: str = "") -> str:
+        # Hash tag keeps all keys of one room in the same cluster slot.
+        base = f"{self._prefix}:room:{{{code}}}"
+        return f"{base}:{part}" if part else base
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self._prefix}:rooms"
+
+    def get(self, code: str) -> Room | None:
+        cached = self._cache.get(code)
+        stored_version = self._r.hget(self._key(code), "v")
+        if stored_version is None:
+            if cached is not None:
+                self._cache.pop(code, None)
+                self._synced.pop(code, None)
+            return None
+        if cached is not None and cached.version >= int(stored_version):
+            return cached
+        return self._load(code, cached)
+
+    def add(self, room: Room) -> bool:
+        if not self._r.sadd(self._index_key, room.code):
+            return False
+        self._cache[room.code] = room
+        self.save(room)
+        return True
+
+    def remove(self, code: str) -> Room | None:
+        room = self._cache.pop(code, None)
+        if room is None:
+            room = self._load(code, None)
+        self._synced.pop(code, None)
+        pipe = self._r.pipeline()
+        pipe.srem(self._index_key, code)
+        pipe.delete(self._key(code), self._key(code, "p"), self._key(code, "sc"), *(self._key(code, k) for k in _SETS))
+        pipe.execute()
+        return room
+
+    def all(self) -> list[Room]:
+        rooms = [self.get(_s(code)) for code in self._r.smembers(self._index_key)]
+        return [r for r in rooms if r is not None]
+
+    def save(self, room: Room) -> None:
+        """Write the room's changes; call with ``room.lock`` held.
+
+        If another worker saved the room since it was last synced here, the
+        room is reloaded afterwards so it also carries that worker's changes.
+        """
+        code = room.code
+        data = _encode(room)
+        base_version, prev = self._synced.get(code, (None, _empty()))
+        key = self._key(code)
+
+        # One MULTI/EXEC: the stored version read first tells whether anyone
+        # else wrote in between.
+        pipe = self._r.pipeline()
+        pipe.hget(key, "v")
+        fields = {k: v for k, v in data["h"].items() if prev["h"].get(k) != v}
+        absent = [k for k in prev["h"] if k not in data["h"]]
+        if fields:
+            pipe.hset(key, mapping=fields)
+        if absent:
+            pipe.hdel(key, *absent)
+        for part in ("p", "sc"):
+            changed = {pid: v for pid, v in data[part].items() if prev[part].get(pid) != v}
+            gone = [pid for pid in prev[part] if pid not in data[part]]
+            if changed:
+                pipe.hset(self._key(code, part), mapping=changed)
+            if gone:
+                pipe.hdel(self._key(code, part), *gone)
+        for short in _SETS:
+            added = data[short] - prev[short]
+            removed = prev[short] - data[short]
+            if added:
+                pipe.sadd(self._key(code, short), *added)
+            if removed:
+                pipe.srem(self._key(code, short), *removed)
+        self._bump(keys=[key], args=[room.version], client=pipe)
+        results = pipe.execute()
+
+        stored_before = int(results[0]) if results[0] is not None else None
+        if stored_before != base_version:
+            self._load(code, room)
+            return
+        room.version = int(results[-1])
+        self._synced[code] = (room.version, data)
+
+    def _load(self, code: str, into: Room | None) -> Room | None:
+        if into is None:
+            return self._read(code, None)
+        # The cached room is shared with the threads serving it.
+        with into.lock:
+            return self._read(code, into)
+
+    def _read(self, code: str, into: Room | None) -> Room | None:
+        pipe = self._r.pipeline()
+        pipe.hgetall(self._key(code))
+        pipe.hgetall(self._key(code, "p"))
+        pipe.hgetall(self._key(code, "sc"))
+        for short in _SETS:
+            pipe.smembers(self._key(code, short))
+        raw, raw_players, raw_scores, *raw_sets = pipe.execute()
+        if not raw:
+            return None
+
+        data = {_s(k): _s(v) for k, v in raw.items()}
+        room = into if into is not None else Room(code=code, owner_id=data.get("o", ""))
+        for short, (attr, kind) in _SCALARS.items():
+            value = data.get(short)
+            setattr(room, attr, kind(value) if value is not None else None)
+        for short, attr in _LISTS.items():
+            setattr(room, attr, json.loads(data[short]) if short in data else [])
+        for (short, attr), members in zip(_SETS.items(), raw_sets):
+            setattr(room, attr, {_s(m) for m in members})
+
+        scores = {_s(k): int(v) for k, v in raw_scores.items()}
+        room.players = {}
+        room.player_key_index = {}
+        for pid_raw, value in raw_players.items():
+            pid = _s(pid_raw)
+            name, avatar, connected, player_key = json.loads(_s(value))
+            room.players[pid] = Player(
+                id=pid,
+                name=name,
+                avatar=avatar,
+                score=scores.get(pid, 0),
+                connected=bool(connected),
+                player_key=player_key,
+            )
+            if player_key:
+                room.player_key_index[player_key] = pid
+
+        room.owner_id = room.owner_id or ""
+        room.state = room.state or "lobby"
+        room.version = int(data.get("v", "0"))
+        self._cache[code] = room
+        self._synced[code] = (room.version, _encode(room))
+        if self.on_load is not None:
+            self.on_load(room)
+        return room
+
+    def claim_deadlines(self, code: str, ttl_ms: int) -> bool:
+        """Take or renew this worker's lease on driving the room's deadlines."""
+        if self._owner_pid != os.getpid():
+            # Forked workers must not share the parent's identity.
+            self._owner_pid = os.getpid()
+            self._owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        return bool(self._lease(keys=[f"{self._prefix}:lease:{{{code}}}"], args=[self._owner, ttl_ms]))
+
+    def _synced_data(self, code: str) -> dict:
+        # What the Lua updates below store is recorded as synced, so the next
+        # save does not write it again.
+        synced = self._synced.get(code)
+        return synced[1] if synced is not None else _empty()
+
+    def add_vote(self, room: Room, kind: str, voter_socket_id: str) -> int:
+        short = "ab" if kind == "abort" else "mab"
+        members = {_s(m) for m in self._vote(keys=[self._key(room.code, short)], args=[voter_socket_id])}
+        setattr(room, _SETS[short], members)
+        self._synced_data(room.code)[short] = set(members)
+        return len(members)
+
+    def record_guess(self, room: Room, guesser_socket_id: str, guesser_points: int, drawer_points: int) -> bool:
+        drawer = room.drawer_id if room.drawer_id and room.drawer_id in room.players else ""
+        added, guesser_score, drawer_score = self._guess(
+            keys=[self._key(room.code, "cg"), self._key(room.code, "sc"), self._key(room.code, "p")],
+            args=[guesser_socket_id, drawer, guesser_points, drawer_points],
+        )
+        synced = self._synced_data(room.code)
+        room.correct_guessers.add(guesser_socket_id)
+        synced["cg"].add(guesser_socket_id)
+        if not int(added):
+            return False
+
+        if guesser_socket_id in room.players:
+            room.players[guesser_socket_id].score = synced["sc"][guesser_socket_id] = int(guesser_score)
+        if drawer:
+            room.players[drawer].score = synced["sc"][drawer] = int(drawer_score)
+        return True
+
+
+def create_store() -> MemoryRoomStore | RedisRoomStore:
+    backend = Config.ROOM_STORE
+    if backend == "redis":
+        import redis
+
+        return RedisRoomStore(redis.Redis.from_url(Config.REDIS_URL))
+    if backend != "memory":
+        raise ValueError(f"unknown ROOM_STORE: {backend}")
+    return MemoryRoomStore()
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import random
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable
+
+from .words import DEFAULT_WORDS_ZH
+
+# (language, category, difficulty); None in a query means "any".
+_Key = tuple[str, str, int]
+
+
+class WordBank:
+    """Deduplicated word store indexed by language, category and difficulty.
+
+    Words are kept once in a flat list; every index is an ``array`` of ids
+    into it, so large packs cost little beyond the strings themselves.
+    Sampling picks random ids and never copies an index.
+    """
+
+    def __init__(self) -> None:
+        self._words: list[str] = []
+        self._ids: dict[str, int] = {}
+        # Buckets each word id belongs to, parallel to _words.
+        self._keys: list[tuple[_Key, ...]] = []
+        self._index: dict[_Key, array] = {}
+        # Per-query unions of several index buckets, rebuilt after adds.
+        self._views: dict[tuple, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, word: str, lang: str = "zh", category: str = "", difficulty: int = 0) -> bool:
+        w = word.strip()
+        if not w:
+            return False
+        key = (lang, category, difficulty)
+        wid = self._ids.get(w)
+        if wid is None:
+            wid = self._ids[w] = len(self._words)
+            self._words.append(w)
+            self._keys.append((key,))
+        elif key in self._keys[wid]:
+            return False
+        else:
+            self._keys[wid] += (key,)
+        self._index.setdefault(key, array("I")).append(wid)
+        self._views.clear()
+        return True
+
+    def add_many(self, words: Iterable[str], lang: str = "zh", category: str = "", difficulty: int = 0) -> int:
+        return sum(self.add(w, lang, category, difficulty) for w in words)
+
+    def load_pack(self, path: str | Path, lang: str | None = None) -> int:
+        """Load a pack file; returns the number of words added.
+
+        One word per line, optionally followed by tab-separated category and
+        difficulty. Blank lines and ``#`` comments are skipped. The language
+        defaults to the first dot-separated part of the file name
+        (``zh.animals.txt`` -> ``zh``).
+        """
+        p = Path(path)
+        lang = lang or p.name.split(".", 1)[0]
+        added = 0
+        with p.open(encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                parts = line.split("\t")
+                category = parts[1].strip() if len(parts) > 1 else ""
+                try:
+                    difficulty = int(parts[2]) if len(parts) > 2 else 0
+                except ValueError:
+                    difficulty = 0
+                added += self.add(parts[0], lang, category, difficulty)
+        return added
+
+    def load_dir(self, directory: str | Path) -> int:
+        return sum(self.load_pack(p) for p in sorted(Path(directory).glob("*.txt")))
+
+    def languages(self) -> list[str]:
+        return sorted({k[0] for k in self._index})
+
+    def categories(self, lang: str | None = None) -> list[str]:
+        return sorted({k[1] for k in self._index if lang is None or k[0] == lang})
+
+    def _view(self, lang: str | None, category: str | None, difficulty: int | None) -> array:
+        q = (lang, category, difficulty)
+        view = self._views.get(q)
+        if view is not None:
+            return view
+        keys = [
+            k
+            for k in self._index
+            if (lang is None or k[0] == lang)
+            and (category is None or k[1] == category)
+            and (difficulty is None or k[2] == difficulty)
+        ]
+        if not keys:
+            # Not cached: unknown filters come straight from query strings.
+            return array("I")
+        if len(keys) == 1:
+            view = self._index[keys[0]]
+        else:
+            # A word may sit in several buckets; keep it once.
+            view = array("I", dict.fromkeys(i for k in keys for i in self._index[k]))
+        self._views[q] = view
+        return view
+
+    def size(self, lang: str | None = None, category: str | None = None, difficulty: int | None = None) -> int:
+        return len(self._view(lang, category, difficulty))
+
+    def sample(
+        self,
+        count: int,
+        lang: str | None = None,
+        category: str | None = None,
+        difficulty: int | None = None,
+        extra: list[str] | None = None,
+        exclude: set[str] | frozenset[str] = frozenset(),
+    ) -> list[str]:
+        """Up to ``count`` distinct words, drawn uniformly from the matching
+        bank words plus ``extra`` (e.g. a room's custom words)."""
+        if count <= 0:
+            return []
+        ids = self._view(lang, category, difficulty)
+        extra = extra or []
+        n_extra = len(extra)
+        total = n_extra + len(ids)
+
+        def word_at(i: int) -> str:
+            return extra[i] if i < n_extra else self._words[ids[i - n_extra]]
+
+        picked: dict[str, None] = {}
+        # Rejection sampling is O(count) while the pool is much larger than the
+        # request; small or mostly-excluded pools fall back to a full scan.
+        attempts = count * 8
+        while len(picked) < count and attempts > 0 and total > count * 2:
+            attempts -= 1
+            w = word_at(random.randrange(total))
+            if w not in exclude:
+                picked[w] = None
+        if len(picked) < count:
+            rest = [w for w in dict.fromkeys(word_at(i) for i in range(total)) if w not in exclude and w not in picked]
+            picked.update(dict.fromkeys(random.sample(rest, k=min(count - len(picked), len(rest)))))
+        return list(picked)
+
+    def cursor(
+        self,
+        lang: str | None = None,
+        category: str | None = None,
+        difficulty: int | None = None,
+        extra: list[str] | None = None,
+    ) -> WordCursor:
+        return WordCursor(self._words, self._view(lang, category, difficulty), list(extra or []))
+
+
+class WordCursor:
+    """Lazily shuffled permutation over bank ids plus extra words.
+
+    A Fisher-Yates shuffle performed one step per draw: only swapped
+    positions are remembered, so each word costs O(1) and memory grows with
+    the number of words drawn, not the size of the bank.
+    """
+
+    def __init__(self, words: list[str], ids: array, extra: list[str]) -> None:
+        self._words = words
+        self._ids = ids
+        self._extra = extra
+        self._n = len(extra) + len(ids)
+        self._pos = 0
+        self._swaps: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self._n - self._pos
+
+    def next(self) -> str | None:
+        if self._pos >= self._n:
+            return None
+        i = self._pos
+        j = random.randrange(i, self._n)
+        picked = self._swaps.get(j, j)
+        self._swaps[j] = self._swaps.pop(i, i)
+        self._pos += 1
+        n_extra = len(self._extra)
+        return self._extra[picked] if picked < n_extra else self._words[self._ids[picked - n_extra]]
+
+
+class WordSchedule:
+    """Per-room word dealer that avoids repeats.
+
+    Words come off a shuffled cursor, so nothing repeats until the pool is
+    used up. The last ``recent_size`` words handed out are also skipped when
+    the cursor is reshuffled or the room's word pool changes between matches,
+    at most half the pool so that a reshuffle always has fresh words left.
+    """
+
+    def __init__(self, bank: WordBank, recent_size: int = 200) -> None:
+        self._bank = bank
+        self._recent: OrderedDict[str, None] = OrderedDict()
+        self._recent_size = recent_size
+        self._window = recent_size
+        self._pool: tuple | None = None
+        self._cursor: WordCursor | None = None
+
+    def remember(self, word: str) -> None:
+        self._recent[word] = None
+        self._recent.move_to_end(word)
+        self._trim()
+
+    def _trim(self) -> None:
+        while len(self._recent) > self._window:
+            self._recent.popitem(last=False)
+
+    def take(
+        self,
+        count: int,
+        lang: str | None = None,
+        category: str | None = None,
+        difficulty: int | None = None,
+        extra: list[str] | None = None,
+    ) -> list[str]:
+        pool = (lang, category, difficulty, tuple(extra or ()))
+        if pool != self._pool or self._cursor is None:
+            self._pool = pool
+            self._cursor = self._bank.cursor(lang, category, difficulty, extra)
+            self._window = min(self._recent_size, len(self._cursor) // 2)
+            self._trim()
+
+        picked: list[str] = []
+        reshuffled = False
+        while len(picked) < count:
+            word = self._cursor.next()
+            if word is None:
+                if reshuffled:
+                    break
+                self._cursor = self._bank.cursor(lang, category, difficulty, extra)
+                reshuffled = True
+                continue
+            if word in self._recent or word in picked:
+                continue
+            picked.append(word)
+
+        if len(picked) < count:
+            # Pool too small for ``count`` fresh words: allow recent words again.
+            picked += self._bank.sample(
+                count - len(picked), lang, category, difficulty, extra=extra, exclude=set(picked)
+            )
+        for word in picked:
+            self.remember(word)
+        return picked
+
+
+def create_word_bank(packs_dir: str = "") -> WordBank:
+    bank = WordBank()
+    bank.add_many(DEFAULT_WORDS_ZH, lang="zh")
+    if packs_dir:
+        bank.load_dir(packs_dir)
+    return bank
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from threading import Lock
+from typing import Any
+
+from engineio import packet as eio_packet
+from flask_socketio import SocketIO
+from socketio import PubSubManager
+from socketio import packet as sio_packet
+
+
+class _RateWindow:
+    """Per-second event counts over the last ``seconds`` seconds."""
+
+    def __init__(self, seconds: int = 10) -> None:
+        self._buckets: deque[list[int]] = deque(maxlen=seconds)
+
+    def add(self, n: int, now: int) -> None:
+        if self._buckets and self._buckets[-1][0] == now:
+            self._buckets[-1][1] += n
+        else:
+            self._buckets.append([now, n])
+
+    def per_sec(self, now: int) -> float:
+        # Only complete seconds count; the current one is still filling.
+        span = self._buckets.maxlen - 1
+        total = sum(n for sec, n in self._buckets if now - span <= sec < now)
+        return total / span if span else 0.0
+
+
+class Broadcaster:
+    """Room fan-out that encodes each packet once.
+
+    The Socket.IO frame is built a single time and the same Engine.IO packet
+    is written to every recipient's socket. Payloads that are already JSON
+    (e.g. cached room snapshots) are spliced into the frame without being
+    re-encoded. With a message queue, emits go through Flask-SocketIO so they
+    reach other workers.
+    """
+
+    def __init__(self, socketio: SocketIO, namespace: str = "/") -> None:
+        self._socketio = socketio
+        self._namespace = namespace
+        self._lock = Lock()
+        self._rate = _RateWindow()
+        self.events = 0
+        self.writes = 0
+        self.bytes = 0
+        self.by_event: dict[str, int] = {}
+
+    @property
+    def _server(self):
+        return self._socketio.server
+
+    def _direct(self) -> bool:
+        return self._server is not None and not isinstance(self._server.manager, PubSubManager)
+
+    def _count(self, event: str, writes: int, size: int) -> None:
+        now = int(time.monotonic())
+        with self._lock:
+            self.events += 1
+            self.writes += writes
+            self.bytes += size * writes
+            self.by_event[event] = self.by_event.get(event, 0) + 1
+            self._rate.add(writes, now)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "events": self.events,
+                "writes": self.writes,
+                "bytes": self.bytes,
+                "writesPerSec": round(self._rate.per_sec(int(time.monotonic())), 1),
+                "byEvent": dict(self.by_event),
+            }
+
+    def _send(self, event: str, frames: list, to: Any, skip_sid: Any) -> None:
+        skip = set(skip_sid) if isinstance(skip_sid, (list, tuple, set)) else {skip_sid}
+        eio_pkts = [eio_packet.Packet(eio_packet.MESSAGE, f) for f in frames]
+        size = sum(len(f) for f in frames)
+        server = self._server
+        writes = 0
+        for sid, eio_sid in server.manager.get_participants(self._namespace, to):
+            if sid in skip:
+                continue
+            for p in eio_pkts:
+                server._send_eio_packet(eio_sid, p)
+            writes += 1
+        self._count(event, writes, size)
+
+    def emit(self, event: str, data: Any, to: Any, skip_sid: Any = None) -> None:
+        if not self._direct():
+            self._socketio.emit(event, data, to=to, skip_sid=skip_sid, namespace=self._namespace)
+            self._count(event, 1, 0)
+            return
+        pkt = self._server.packet_class(sio_packet.EVENT, namespace=self._namespace, data=[event, data])
+        frames = pkt.encode()
+        self._send(event, frames if isinstance(frames, list) else [frames], to, skip_sid)
+
+    def emit_json(self, event: str, body: bytes | str, to: Any, skip_sid: Any = None) -> None:
+        """Emit a payload that is already serialized as JSON."""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        # Binary serializers (msgpack) cannot take a JSON fragment as is.
+        if not self._direct() or not getattr(self._server.packet_class, "uses_binary_events", True):
+            self.emit(event, json.loads(body), to=to, skip_sid=skip_sid)
+            return
+        ns = "" if self._namespace == "/" else f"{self._namespace},"
+        frame = f"{sio_packet.EVENT}{ns}[{json.dumps(event)},{body}]"
+        self._send(event, [frame], to, skip_sid)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from threading import Lock
+
+
+class DrawBuffer:
+    """Per-room outbound buffer of Excalidraw elements awaiting broadcast.
+
+    Within one flush window only the newest version of each element id is
+    kept, so a burst of deltas collapses into a single merged packet.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._pending: dict[str, dict[str, dict]] = {}
+        self._senders: dict[str, str] = {}
+
+    def add(self, room_code: str, sender_sid: str, elements: list[dict]) -> bool:
+        """Buffer elements; returns True if this call opened a new flush window."""
+        with self._lock:
+            pending = self._pending.get(room_code)
+            opened = pending is None
+            if opened:
+                pending = self._pending[room_code] = {}
+            for el in elements:
+                pending[el["id"]] = el
+            self._senders[room_code] = sender_sid
+            return opened
+
+    def sender(self, room_code: str) -> str | None:
+        """Sid of the latest buffered elements; None if nothing is buffered."""
+        with self._lock:
+            return self._senders.get(room_code)
+
+    def take(self, room_code: str) -> tuple[str | None, list[dict]]:
+        with self._lock:
+            pending = self._pending.pop(room_code, None)
+            sender = self._senders.pop(room_code, None)
+        return sender, list(pending.values()) if pending else []
+
+    def discard(self, room_code: str) -> None:
+        with self._lock:
+            self._pending.pop(room_code, None)
+            self._senders.pop(room_code, None)
@@ -1,29 +1,110 @@
 from __future__ import annotations
 
+import os
 import re
+import time
+from functools import wraps
+from threading import Lock
 from typing import Any
 
 from flask import request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
+from ..config import Config
 from ..game import service
+from ..game.freedraw import decode_elements
+from ..game.scheduler import DeadlineScheduler
+from ..utils.ip import get_client_ip
+from ..utils.metrics import Histogram
+from ..utils.profiler import attributed
+from .broadcast import Broadcaster
+from .drawbuffer import DrawBuffer
+from .ratelimit import RateLimiter
+
+
+# Background task name -> pid of the process running it (tasks do not survive fork).
+_room_tasks: dict[str, int] = {}
+_room_tasks_lock = Lock()
+_draw_buffer = DrawBuffer()
+# Pending draw work, drained by one long-lived task: a room code is due when
+# its flush window closes, _DEFERRED + room code when its held-back deltas
+# should be retried.
+_draw_flushes = DeadlineScheduler()
+_DEFERRED = "deferred:"
+# Drawer deltas held back by the draw rate limit, coalesced per room.
+_deferred_draws = DrawBuffer()
+_limiter = RateLimiter(
+    {"chat": Config.RATE_LIMIT_CHAT, "guess": Config.RATE_LIMIT_GUESS, "draw": Config.RATE_LIMIT_DRAW},
+    ip_factor=Config.RATE_LIMIT_IP_FACTOR,
+)
+# sid -> room code -> (acknowledged state version, view)
+_state_acks: dict[str, dict[str, tuple[int, str]]] = {}
+# Sids that announced they decode compact freedraw points (see game/freedraw.py).
+_freedraw_sids: set[str] = set()
+# Sids of legacy clients that rely on game:tick instead of syncing their clock.
+_tick_sids: set[str] = set()
+# Set by register_socketio_handlers; room fan-out goes through it.
+_broadcaster: Broadcaster | None = None
+# Sids connected to this worker.
+_connected_sids: set[str] = set()
+# Wall time spent in each Socket.IO event handler, by event name.
+handler_latency = Histogram()
+# Background task name -> number currently running.
+_live_tasks: dict[str, int] = {}
+_live_tasks_lock = Lock()
+
+
+def broadcast_stats() -> dict:
+    return _broadcaster.stats() if _broadcaster is not None else {}
+
+
+def socket_count() -> int:
+    return len(_connected_sids)
+
+
+def background_task_counts() -> dict[str, int]:
+    with _live_tasks_lock:
+        return dict(_live_tasks)
+
+
+def rate_limit_drops() -> dict[str, int]:
+    return dict(_limiter.dropped)
+
+
+def _start_task(socketio: SocketIO, fn, *args) -> None:
+    name = fn.__name__.lstrip("_")
+
+    def run() -> None:
+        try:
+            fn(*args)
+        finally:
+            with _live_tasks_lock:
+                _live_tasks[name] -= 1
+
+    with _live_tasks_lock:
+        _live_tasks[name] = _live_tasks.get(name, 0) + 1
+    socketio.start_background_task(run)
+
+
+def _instrumented(event: str, handler):
+    @wraps(handler)
+    def wrapper(*args):
+        # Flask-SocketIO handlers are called as (sid, data, ...).
+        data = args[1] if len(args) > 1 else None
+        room_code = data.get("roomCode") if isinstance(data, dict) else None
+        start = time.perf_counter()
+        try:
+            return attributed(event, room_code, handler, *args)
+        finally:
+            handler_latency.observe(event, time.perf_counter() - start)
 
-
-_room_tasks: dict[str, bool] = {}
-
-
-def _normalize_text(text: str) -> str:
-    t = text.strip().lower()
-    t = re.sub(r"\s+", "", t)
-    t = re.sub(r"[^0-9a-z\u4e00-\u9fff]", "", t)
-    return t
+    return wrapper
 
 
-def _contains_answer(text: str, answer: str) -> bool:
-    a = _normalize_text(answer)
-    if not a:
-        return False
-    return a in _normalize_text(text)
+def _instrument_handlers(socketio: SocketIO, namespace: str = "/") -> None:
+    handlers = socketio.server.handlers.get(namespace, {})
+    for event, handler in list(handlers.items()):
+        handlers[event] = _instrumented(event, handler)
 
 
 def _validate_name(name: str) -> bool:
@@ -42,6 +123,26 @@ def _validate_name(name: str) -> bool:
     return True
 
 
+def _allowed(kind: str) -> bool:
+    return not Config.RATE_LIMIT_ENABLED or _limiter.allow(request.sid, kind)
+
+
+def _draw_retry_ms() -> int:
+    # About when the drawer's bucket has one token again.
+    rate, _ = Config.RATE_LIMIT_DRAW
+    return max(1, int(1000 / rate)) if rate > 0 else 1000
+
+
+def _cap_elements(elements: list) -> list:
+    capped = []
+    for el in elements[: Config.DRAW_MAX_ELEMENTS]:
+        points = el.get("points") if isinstance(el, dict) else None
+        if isinstance(points, list) and len(points) > Config.DRAW_MAX_POINTS:
+            continue
+        capped.append(el)
+    return capped
+
+
 def _normalize_avatar(raw: str) -> str:
     a = (raw or "").strip()
     if re.fullmatch(r"\d{5,12}", a):
@@ -50,6 +151,9 @@ def _normalize_avatar(raw: str) -> str:
 
 
 def register_socketio_handlers(socketio: SocketIO) -> None:
+    global _broadcaster
+    broadcaster = _broadcaster = Broadcaster(socketio)
+
     def _broadcast_room_state(room_code: str) -> None:
         room = service.get_room(room_code)
         if not room:
@@ -60,12 +164,37 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
                 pass
             return
 
-        public_state = service.room_public_state(room)
-        socketio.emit("room:state", public_state, to=room_code)
-
-        if room.drawer_id:
-            private_state = service.room_public_state(room, viewer_socket_id=room.drawer_id)
-            socketio.emit("room:state", private_state, to=room.drawer_id)
+        # Clients that acknowledge state versions get room:state_patch; the rest
+        # (and anyone too far behind) keep getting the full room:state.
+        patch_groups: dict[tuple[str, int], list[str]] = {}
+        for sid in list(room.players.keys()):
+            ack = _state_acks.get(sid, {}).get(room_code)
+            if ack is None:
+                continue
+            version, view = ack
+            if view != service.room_state_view(room, sid):
+                continue
+            patch_groups.setdefault((view, version), []).append(sid)
+        patch_sids = [sid for sids in patch_groups.values() for sid in sids]
+
+        with room.lock:
+            public_version = service.room_public_state(room)["version"]
+            public_body = service.room_public_state_json(room)
+        broadcaster.emit_json("room:state", public_body, to=room_code, skip_sid=patch_sids or None)
+
+        if room.drawer_id and room.drawer_id not in patch_sids:
+            private_body = service.room_public_state_json(room, viewer_socket_id=room.drawer_id)
+            broadcaster.emit_json("room:state", private_body, to=room.drawer_id)
+
+        for (view, version), sids in patch_groups.items():
+            viewer = room.drawer_id if view == "drawer" else None
+            if version == public_version:
+                continue
+            patch = service.room_state_patch(room, version, viewer_socket_id=viewer)
+            if patch is None:
+                broadcaster.emit_json("room:state", service.room_public_state_json(room, viewer_socket_id=viewer), to=sids)
+            else:
+                broadcaster.emit("room:state_patch", patch, to=sids)
 
     def _safe_broadcast_room_state(room_code: str) -> None:
         try:
@@ -73,25 +202,142 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
         except Exception:
             return
 
-    def _append_chat(room, msg: dict) -> None:
+    def _append_chat(room, sender: str, text: str) -> int | None:
         try:
-            room.chat_history.append(msg)
-            if len(room.chat_history) > 200:
-                room.chat_history = room.chat_history[-200:]
+            seq = room.chat_history.append(sender, text)
+            service.log_event(room, "chat", {"seq": seq, "from": sender, "text": text})
+            return seq
         except Exception:
+            return None
+
+    def _broadcast_chat(room_code: str, room, sender: str, text: str) -> None:
+        msg = {"roomCode": room_code, "from": sender, "text": text}
+        if not room:
+            broadcaster.emit("chat:message", msg, to=room_code)
+            return
+        # Seq assignment and emit share the lock, so clients see seqs in order.
+        with room.lock:
+            seq = _append_chat(room, sender, text)
+            if seq is not None:
+                msg["seq"] = seq
+            broadcaster.emit("chat:message", msg, to=room_code)
+
+    def _chat_sync_payload(room_code: str, room, last_seen: Any) -> dict:
+        # Call with room.lock held.
+        log = room.chat_history
+        messages = None
+        if isinstance(last_seen, int) and not isinstance(last_seen, bool):
+            messages = log.since(last_seen)
+        payload = {"roomCode": room_code, "seq": log.seq, "incremental": messages is not None}
+        payload["messages"] = messages if messages is not None else log.messages()
+        return payload
+
+    def _emit_elements(event: str, room_code: str, room, payload: dict, skip_sid: str | None = None) -> None:
+        """Broadcast elements to the room, compact to sids that can decode them."""
+        if not Config.FREEDRAW_CODEC or room is None:
+            broadcaster.emit(event, payload, to=room_code, skip_sid=skip_sid)
+            return
+        compact = [sid for sid in room.players if sid in _freedraw_sids and sid != skip_sid]
+        if compact:
+            broadcaster.emit(event, payload, to=compact)
+        skip = compact + [skip_sid] if skip_sid else compact
+        if len(skip) < len(room.players):
+            plain = {**payload, "elements": decode_elements(payload["elements"])}
+            broadcaster.emit(event, plain, to=room_code, skip_sid=skip or None)
+
+    def _apply_draw(room_code: str, room, sender_sid: str, elements: list) -> None:
+        # Merge changed elements into draw_history; stale versions are dropped.
+        # Merged elements enter the buffer under the same lock, so a flush
+        # labelled with the scene seq carries everything up to that seq.
+        with room.lock:
+            try:
+                accepted, seq = service.apply_draw_change(room, elements)
+            except Exception:
+                return
+            if not accepted:
+                return
+            buffered = Config.DRAW_FLUSH_INTERVAL_MS > 0
+            opened = buffered and _draw_buffer.add(room_code, sender_sid, accepted)
+
+        if not buffered:
+            msg = {"roomCode": room_code, "elements": accepted, "seq": seq}
+            _emit_elements("draw:excalidraw_change", room_code, room, msg, skip_sid=sender_sid)
             return
 
-    def _append_draw(room, item: dict) -> None:
-        try:
-            room.draw_history.append(item)
-            if len(room.draw_history) > 2000:
-                room.draw_history = room.draw_history[-2000:]
-        except Exception:
+        if opened:
+            _schedule_draw_work(room_code, service.now_ms() + Config.DRAW_FLUSH_INTERVAL_MS)
+
+    def _schedule_draw_work(key: str, at_ms: int) -> None:
+        _draw_flushes.wake_at(key, at_ms)
+        with _room_tasks_lock:
+            if _room_tasks.get("draw_flush") == os.getpid():
+                return
+            _room_tasks["draw_flush"] = os.getpid()
+        _start_task(socketio, _run_draw_flushes)
+
+    def _apply_deferred_draws(room_code: str) -> None:
+        sender_sid = _deferred_draws.sender(room_code)
+        if sender_sid is None:
+            return
+        room = service.get_room(room_code)
+        if not room or room.state != "playing" or sender_sid != room.drawer_id:
+            _deferred_draws.discard(room_code)
+            return
+        # The merged batch is one more draw packet. While the drawer is still
+        # over budget it stays buffered (newer deltas keep merging into it)
+        # and is retried, never dropped: clients only ever see changed
+        # elements, so a lost batch could leave a stroke truncated for good.
+        if Config.RATE_LIMIT_ENABLED and not _limiter.allow(sender_sid, "draw"):
+            _draw_flushes.wake_at(_DEFERRED + room_code, service.now_ms() + _draw_retry_ms())
             return
+        _, elements = _deferred_draws.take(room_code)
+        if elements:
+            _apply_draw(room_code, room, sender_sid, elements)
+
+    def _flush_draw(room_code: str) -> None:
+        room = service.get_room(room_code)
+        if room is None:
+            seq = None
+            sender_sid, elements = _draw_buffer.take(room_code)
+        else:
+            with room.lock:
+                sender_sid, elements = _draw_buffer.take(room_code)
+                seq = room.draw_history.seq
+        if not elements:
+            return
+        _emit_elements(
+            "draw:excalidraw_change",
+            room_code,
+            room,
+            {"roomCode": room_code, "elements": elements, "seq": seq},
+            skip_sid=sender_sid,
+        )
+
+    def _run_draw_flushes() -> None:
+        while True:
+            for key in _draw_flushes.pop_due(service.now_ms()):
+                try:
+                    if key.startswith(_DEFERRED):
+                        room_code = key[len(_DEFERRED) :]
+                        attributed("draw_deferred", room_code, _apply_deferred_draws, room_code)
+                    else:
+                        attributed("draw_flush", key, _flush_draw, key)
+                except Exception:
+                    continue
+            _draw_flushes.wait(service.now_ms(), max_wait_ms=1000)
+
+    def _clear_board(room_code: str, room, payload: dict) -> None:
+        seq = service.clear_drawing(room)
+        # Pending deltas belong to the old board.
+        _draw_buffer.discard(room_code)
+        _draw_flushes.cancel(room_code)
+        _deferred_draws.discard(room_code)
+        _draw_flushes.cancel(_DEFERRED + room_code)
+        broadcaster.emit("draw:clear", {**payload, "seq": seq}, to=room_code)
 
     def _handle_correct_guess(room_code: str, room, guesser_socket_id: str) -> None:
         # Prevent duplicate scoring per round
-        if guesser_socket_id in room.correct_guessers:
+        if not service.record_correct_guess(room, guesser_socket_id):
             emit(
                 "chat:message",
                 {"roomCode": room_code, "from": "system", "text": "你已经猜中过了"},
@@ -99,81 +345,113 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
             )
             return
 
-        room.correct_guessers.add(guesser_socket_id)
-
-        # score
-        if guesser_socket_id in room.players:
-            room.players[guesser_socket_id].score += 10
-        if room.drawer_id and room.drawer_id in room.players:
-            room.players[room.drawer_id].score += 5
-
-        emit("guess:correct", {"roomCode": room_code, "by": guesser_socket_id}, to=room_code)
+        broadcaster.emit("guess:correct", {"roomCode": room_code, "by": guesser_socket_id}, to=room_code)
         # If all non-drawer players have guessed, end the round immediately.
         try:
             if room.state == "playing" and room.drawer_id:
                 non_drawers = [pid for pid in room.players.keys() if pid != room.drawer_id]
                 if non_drawers and all(pid in room.correct_guessers for pid in non_drawers):
                     service.reveal_round(room)
-                    socketio.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
+                    broadcaster.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
         except Exception:
             pass
 
         _safe_broadcast_room_state(room_code)
         return
 
-    def _ensure_room_task(room_code: str) -> None:
-        if _room_tasks.get(room_code):
-            return
-        _room_tasks[room_code] = True
-
-        def _runner() -> None:
-            last_sent: dict[str, int] = {}
-            while True:
-                room = service.get_room(room_code)
-                if not room:
-                    break
+    def _emit_close_hint(room_code: str, guesser_socket_id: str) -> None:
+        emit(
+            "chat:message",
+            {"roomCode": room_code, "from": "system", "text": "很接近了！"},
+            to=guesser_socket_id,
+        )
 
-                now = service.now_ms()
+    def _wants_tick(room) -> bool:
+        if Config.GAME_TICK == "off" or not room.players:
+            return False
+        return Config.GAME_TICK == "always" or any(sid in _tick_sids for sid in room.players)
 
-                # Auto-destroy empty room after TTL (10s)
-                try:
-                    if not room.players:
-                        if room.last_empty_at_ms is None:
-                            room.last_empty_at_ms = now
-                        elif now - room.last_empty_at_ms >= 10_000:
-                            service.delete_room(room_code)
-                            break
-                except Exception:
-                    pass
+    def _on_room_due(room_code: str) -> None:
+        room = service.get_room(room_code)
+        if not room:
+            return
 
-                # Choosing timeout -> auto choose first
-                if room.state == "choosing" and room.choose_ends_at_ms and now >= room.choose_ends_at_ms:
-                    service.auto_choose_if_needed(room)
-                    _safe_broadcast_room_state(room_code)
+        now = service.now_ms()
 
-                # Playing timeout -> reveal
-                if room.state == "playing" and room.round_ends_at_ms and now >= room.round_ends_at_ms:
-                    service.reveal_round(room)
-                    socketio.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
-                    _safe_broadcast_room_state(room_code)
+        # With several workers only the lease holder drives the room; the others
+        # check back in case the holder goes away.
+        if not service.claim_room_deadlines(room):
+            service.deadlines.wake_at(room_code, now + Config.DEADLINE_LEASE_MS)
+            return
 
-                # Reveal timeout -> back to lobby
-                if room.state == "reveal" and room.reveal_ends_at_ms and now >= room.reveal_ends_at_ms:
-                    service.advance_after_reveal(room)
-                    _safe_broadcast_room_state(room_code)
+        # Auto-destroy empty room after TTL
+        try:
+            if not room.players:
+                if room.last_empty_at_ms is None:
+                    room.last_empty_at_ms = now
+                elif now - room.last_empty_at_ms >= Config.EMPTY_ROOM_TTL_SEC * 1000:
+                    service.delete_room(room_code)
+                    return
+        except Exception:
+            pass
 
-                # Tick (once per second)
-                sec = int(now / 1000)
-                prev = last_sent.get(room_code)
-                if prev != sec:
-                    last_sent[room_code] = sec
-                    socketio.emit("game:tick", {"roomCode": room_code, "nowMs": now}, to=room_code)
+        # Restored from a snapshot: drop players that never reconnected
+        if room.rejoin_deadline_ms and now >= room.rejoin_deadline_ms:
+            if service.drop_missing_players(room):
+                _safe_broadcast_room_state(room_code)
+
+        # Choosing timeout -> auto choose first
+        if room.state == "choosing" and room.choose_ends_at_ms and now >= room.choose_ends_at_ms:
+            service.auto_choose_if_needed(room)
+            _safe_broadcast_room_state(room_code)
+
+        # Playing timeout -> reveal
+        if room.state == "playing" and room.round_ends_at_ms and now >= room.round_ends_at_ms:
+            service.reveal_round(room)
+            broadcaster.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
+            _safe_broadcast_room_state(room_code)
+
+        # Reveal timeout -> back to lobby
+        if room.state == "reveal" and room.reveal_ends_at_ms and now >= room.reveal_ends_at_ms:
+            service.advance_after_reveal(room)
+            _safe_broadcast_room_state(room_code)
+
+        service.schedule_room(room)
+
+        # Tick (once per second) only while a countdown is running and someone
+        # in the room still needs it; synced clients count down locally.
+        if _wants_tick(room) and service.next_deadline_ms(room) is not None:
+            broadcaster.emit("game:tick", {"roomCode": room_code, "nowMs": now}, to=room_code)
+            service.deadlines.wake_at(room_code, (now // 1000 + 1) * 1000)
+
+    def _run_deadlines() -> None:
+        while True:
+            now = service.now_ms()
+            for room_code in service.deadlines.pop_due(now):
+                try:
+                    attributed("deadline", room_code, _on_room_due, room_code)
+                except Exception:
+                    continue
+            service.deadlines.wait(service.now_ms(), max_wait_ms=1000)
 
-                socketio.sleep(0.25)
+    def _run_snapshots() -> None:
+        while True:
+            socketio.sleep(Config.SNAPSHOT_INTERVAL_SEC)
+            try:
+                attributed("snapshot", None, service.save_snapshot)
+            except Exception:
+                continue
 
-            _room_tasks.pop(room_code, None)
+    def _ensure_room_task(room_code: str) -> None:
+        # Process the room right away (starts any legacy tick for a running countdown);
+        # afterwards it is only woken on its own deadlines.
+        service.deadlines.wake_at(room_code, service.now_ms())
 
-        socketio.start_background_task(_runner)
+        with _room_tasks_lock:
+            if _room_tasks.get("deadlines") == os.getpid():
+                return
+            _room_tasks["deadlines"] = os.getpid()
+        _start_task(socketio, _run_deadlines)
 
     @socketio.on("room:join")
     def room_join(data):
@@ -201,7 +479,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
                 owner_p = room.players.get(room.owner_id)
                 if owner_p and not getattr(owner_p, "player_key", "") and room.owner_id != request.sid:
                     try:
-                        del room.players[room.owner_id]
+                        service.remove_player(room, room.owner_id)
                     except Exception:
                         pass
                     room.owner_id = request.sid
@@ -212,7 +490,8 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
             room.owner_id = request.sid
 
         join_room(room_code)
-        
+        _state_acks.get(request.sid, {}).pop(room_code, None)
+
         # Store old owner_id before upsert (for playerKey migration)
         old_owner_id = room.owner_id
         
@@ -227,16 +506,69 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
             old_pk = room.player_key_index.get(player_key)
             if old_pk == request.sid:
                 room.owner_id = request.sid
+        service.touch_room(room)
 
         # Sync history to the joining client for reconnects / late joiners.
-        draw_hist = getattr(room, "draw_history", [])
-        # For Excalidraw: draw_history is now a list of elements, not stroke objects
-        emit("draw:sync", {"roomCode": room_code, "elements": draw_hist if isinstance(draw_hist, list) else []}, to=request.sid)
-        emit("chat:sync", {"roomCode": room_code, "messages": getattr(room, "chat_history", [])}, to=request.sid)
+        draw_seq = payload.get("drawSeq")
+        if not isinstance(draw_seq, int) or isinstance(draw_seq, bool):
+            draw_seq = None
+        if payload.get("clockSync"):
+            _tick_sids.discard(request.sid)
+        else:
+            _tick_sids.add(request.sid)
+        if payload.get("freedrawCodec"):
+            _freedraw_sids.add(request.sid)
+        else:
+            _freedraw_sids.discard(request.sid)
+        sync = service.draw_sync(room, draw_seq)
+        if request.sid not in _freedraw_sids:
+            sync["elements"] = decode_elements(sync["elements"])
+        emit("draw:sync", {"roomCode": room_code, **sync}, to=request.sid)
+        with room.lock:
+            # No chat:message with a newer seq can overtake the sync.
+            emit("chat:sync", _chat_sync_payload(room_code, room, payload.get("chatSeq")), to=request.sid)
 
         _ensure_room_task(room_code)
         _safe_broadcast_room_state(room_code)
 
+    @socketio.on("clock:ping")
+    def clock_ping(data):
+        # Acked with the server time; clients estimate their offset from the RTT.
+        payload = data or {}
+        return {"t0": payload.get("t0"), "serverMs": service.now_ms()}
+
+    @socketio.on("room:state_ack")
+    def room_state_ack(data):
+        payload = data or {}
+        room_code = str(payload.get("roomCode", "")).strip()
+        view = str(payload.get("view", "public"))
+        try:
+            version = int(payload.get("version"))
+        except Exception:
+            return
+        if not room_code or view not in ("public", "drawer"):
+            return
+
+        room = service.get_room(room_code)
+        if not room or request.sid not in room.players:
+            return
+
+        acks = _state_acks.setdefault(request.sid, {})
+        prev = acks.get(room_code)
+        if prev is None or prev[0] <= version:
+            acks[room_code] = (version, view)
+
+    @socketio.on("room:state_resync")
+    def room_state_resync(data):
+        payload = data or {}
+        room_code = str(payload.get("roomCode", "")).strip()
+        room = service.get_room(room_code) if room_code else None
+        if not room:
+            return
+
+        _state_acks.get(request.sid, {}).pop(room_code, None)
+        emit("room:state", service.room_public_state(room, viewer_socket_id=request.sid))
+
     @socketio.on("profile:update")
     def profile_update(data):
         payload = data or {}
@@ -281,6 +613,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
 
         leave_room(room_code)
         service.remove_player(room, request.sid)
+        _state_acks.get(request.sid, {}).pop(room_code, None)
         _safe_broadcast_room_state(room_code)
 
     @socketio.on("room:set_round_duration")
@@ -391,29 +724,24 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
         elements = payload.get("elements")
         if not isinstance(elements, list):
             return
+        elements = _cap_elements(elements)
 
-        # Merge changed elements into draw_history
-        try:
-            if not hasattr(room, "draw_history") or not isinstance(room.draw_history, list):
-                room.draw_history = []
-            
-            for el in elements:
-                if not isinstance(el, dict) or "id" not in el:
-                    continue
-                # Update or append element
-                idx = next((i for i, e in enumerate(room.draw_history) if isinstance(e, dict) and e.get("id") == el["id"]), None)
-                if idx is not None:
-                    room.draw_history[idx] = el
-                else:
-                    room.draw_history.append(el)
-            
-            # Keep history size reasonable
-            if len(room.draw_history) > 2000:
-                room.draw_history = room.draw_history[-2000:]
-        except Exception:
-            pass
+        if not _allowed("draw"):
+            # Keep only the newest version of each element and apply them once
+            # the drawer's budget has refilled.
+            pending = [el for el in elements if isinstance(el, dict) and isinstance(el.get("id"), str)]
+            if _deferred_draws.add(room_code, request.sid, pending):
+                _schedule_draw_work(_DEFERRED + room_code, service.now_ms() + _draw_retry_ms())
+            return
+
+        if _deferred_draws.sender(room_code) is not None:
+            # Deltas still held back ride along with this packet; newer
+            # versions from this packet win.
+            pending = [el for el in elements if isinstance(el, dict) and isinstance(el.get("id"), str)]
+            _deferred_draws.add(room_code, request.sid, pending)
+            _, elements = _deferred_draws.take(room_code)
 
-        emit("draw:excalidraw_change", {"roomCode": room_code, "elements": elements}, to=room_code, include_self=False)
+        _apply_draw(room_code, room, request.sid, elements)
 
     @socketio.on("draw:clear")
     def draw_clear(data):
@@ -428,48 +756,45 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
         if room.state != "playing" or request.sid != room.drawer_id:
             return
 
-        try:
-            room.draw_history = []
-        except Exception:
-            pass
-
-        emit("draw:clear", payload, to=room_code)
+        _clear_board(room_code, room, payload)
 
     @socketio.on("chat:message")
     def chat_message(data):
         payload = data or {}
         room_code = str(payload.get("roomCode", "")).strip()
-        text = str(payload.get("text", ""))
+        text = str(payload.get("text", ""))[: Config.CHAT_MAX_CHARS]
         if not room_code or not text.strip():
             return
+        if not _allowed("chat"):
+            return
 
         room = service.get_room(room_code)
-        if room and room.word and room.state in ("choosing", "playing") and _contains_answer(text, room.word):
+        result = "wrong"
+        if room and room.word and room.state in ("choosing", "playing"):
             if request.sid == room.drawer_id:
-                msg = {"roomCode": room_code, "from": "system", "text": "画手不能在聊天中泄露答案"}
-                emit("chat:message", msg, to=request.sid)
-                return
-
-            if room.state == "playing":
-                _handle_correct_guess(room_code, room, request.sid)
-                return
-
-        emit(
-            "chat:message",
-            {"roomCode": room_code, "from": request.sid, "text": text},
-            to=room_code,
-        )
-
-        if room:
-            _append_chat(room, {"roomCode": room_code, "from": request.sid, "text": text})
+                if service.is_answer(room, text):
+                    msg = {"roomCode": room_code, "from": "system", "text": "画手不能在聊天中泄露答案"}
+                    emit("chat:message", msg, to=request.sid)
+                    return
+            elif room.state == "playing":
+                result = service.classify_guess(room, text)
+                if result == "correct":
+                    _handle_correct_guess(room_code, room, request.sid)
+                    return
+
+        _broadcast_chat(room_code, room, request.sid, text)
+        if result == "close":
+            _emit_close_hint(room_code, request.sid)
 
     @socketio.on("guess:submit")
     def guess_submit(data):
         payload = data or {}
         room_code = str(payload.get("roomCode", "")).strip()
-        text = str(payload.get("text", ""))
+        text = str(payload.get("text", ""))[: Config.CHAT_MAX_CHARS]
         if not room_code or not text.strip():
             return
+        if not _allowed("guess"):
+            return
 
         room = service.get_room(room_code)
         if not room:
@@ -477,7 +802,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
 
         # Prevent drawer from leaking the answer via chat/guess box.
         if room.word and request.sid == room.drawer_id and room.state in ("choosing", "playing"):
-            if _contains_answer(text, room.word):
+            if service.is_answer(room, text):
                 emit(
                     "chat:message",
                     {"roomCode": room_code, "from": "system", "text": "画手不能直接发送答案"},
@@ -485,12 +810,15 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
                 )
                 return
 
-        if room.state == "playing" and room.word and request.sid != room.drawer_id and _contains_answer(text, room.word):
+        result = "wrong"
+        if room.state == "playing" and room.word and request.sid != room.drawer_id:
+            result = service.classify_guess(room, text)
+        if result == "correct":
             _handle_correct_guess(room_code, room, request.sid)
         else:
-            emit("chat:message", {"roomCode": room_code, "from": request.sid, "text": text}, to=room_code)
-
-            _append_chat(room, {"roomCode": room_code, "from": request.sid, "text": text})
+            _broadcast_chat(room_code, room, request.sid, text)
+            if result == "close":
+                _emit_close_hint(room_code, request.sid)
 
     @socketio.on("game:abort")
     def game_abort(data):
@@ -511,7 +839,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
             return
 
         service.abort_round(room)
-        socketio.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
+        broadcaster.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
         _safe_broadcast_room_state(room_code)
 
     @socketio.on("game:abort_vote")
@@ -527,7 +855,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
 
         votes, needed, aborted = service.add_abort_vote(room, voter_socket_id=request.sid)
         if aborted:
-            socketio.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
+            broadcaster.emit("game:reveal", {"roomCode": room_code, "word": room.word}, to=room_code)
         _safe_broadcast_room_state(room_code)
 
     @socketio.on("game:abort_match")
@@ -595,11 +923,7 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
                     custom_words.append(w.strip())
 
         # New round begins: clear board for everyone and reset server-side history.
-        try:
-            room.draw_history = []
-        except Exception:
-            pass
-        socketio.emit("draw:clear", {"roomCode": room_code}, to=room_code)
+        _clear_board(room_code, room, {"roomCode": room_code})
 
         service.start_match(room, custom_words=custom_words)
         _safe_broadcast_room_state(room_code)
@@ -625,13 +949,33 @@ def register_socketio_handlers(socketio: SocketIO) -> None:
         _broadcast_room_state(room_code)
         _ensure_room_task(room_code)
 
+    @socketio.on("connect")
+    def on_connect(auth=None):
+        _connected_sids.add(request.sid)
+        _limiter.bind(request.sid, get_client_ip(request))
+
     @socketio.on("disconnect")
     def on_disconnect():
-        # Remove player from any rooms where present (MVP linear scan)
-        for r in service.list_rooms():
+        _connected_sids.discard(request.sid)
+        _limiter.forget(request.sid)
+        _state_acks.pop(request.sid, None)
+        _freedraw_sids.discard(request.sid)
+        _tick_sids.discard(request.sid)
+
+        # Remove player from the rooms this socket joined (reverse index lookup)
+        for r in service.rooms_for_player(request.sid):
             if request.sid in r.players:
                 service.remove_player(r, request.sid)
                 # If the disconnected player was the owner, reassign to first remaining player
                 if r.owner_id == request.sid and r.players:
                     r.owner_id = next(iter(r.players.keys()))
+                    service.touch_room(r)
                 _safe_broadcast_room_state(r.code)
+
+    _instrument_handlers(socketio)
+
+    if Config.SNAPSHOT_PATH:
+        # Restored rooms need their deadlines driven before anyone rejoins.
+        for room in service.restore_snapshot():
+            _ensure_room_task(room.code)
+        _start_task(socketio, _run_snapshots)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float) -> None:
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, cost: float, rate: float, burst: float, now: float) -> bool:
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+    def full_at(self, rate: float, burst: float) -> float:
+        return self.updated + (burst - self.tokens) / rate if rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """Token buckets per (sid, kind) and per (client ip, kind).
+
+    ``budgets`` maps an event kind to (tokens per second, burst). The IP
+    bucket for a kind gets ``ip_factor`` times the per-socket budget, so one
+    client can't get around the limit by opening many sockets.
+    """
+
+    def __init__(self, budgets: dict[str, tuple[float, float]], ip_factor: float = 4.0) -> None:
+        self.budgets = budgets
+        self.ip_factor = ip_factor
+        self._lock = Lock()
+        self._sid_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._ip_buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._sid_ips: dict[str, str] = {}
+        self._next_prune = 0.0
+        self.dropped: dict[str, int] = {}
+
+    def bind(self, sid: str, ip: str | None) -> None:
+        if ip:
+            with self._lock:
+                self._sid_ips[sid] = ip
+
+    def forget(self, sid: str) -> None:
+        with self._lock:
+            self._sid_ips.pop(sid, None)
+            for kind in self.budgets:
+                self._sid_buckets.pop((sid, kind), None)
+
+    def allow(self, sid: str, kind: str, cost: float = 1.0) -> bool:
+        budget = self.budgets.get(kind)
+        if budget is None:
+            return True
+        rate, burst = budget
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._sid_buckets.get((sid, kind))
+            if bucket is None:
+                bucket = self._sid_buckets[(sid, kind)] = TokenBucket(burst, now)
+            ok = bucket.take(cost, rate, burst, now)
+
+            ip = self._sid_ips.get(sid)
+            if ok and ip is not None:
+                ip_rate, ip_burst = rate * self.ip_factor, burst * self.ip_factor
+                ip_bucket = self._ip_buckets.get((ip, kind))
+                if ip_bucket is None:
+                    ip_bucket = self._ip_buckets[(ip, kind)] = TokenBucket(ip_burst, now)
+                if not ip_bucket.take(cost, ip_rate, ip_burst, now):
+                    # Refund the socket bucket: the event is dropped anyway.
+                    bucket.tokens += cost
+                    ok = False
+
+            if not ok:
+                self.dropped[kind] = self.dropped.get(kind, 0) + 1
+            if now >= self._next_prune:
+                self._prune(now)
+        return ok
+
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping.
+        self._next_prune = now + 60
+        for (ip, kind), bucket in list(self._ip_buckets.items()):
+            rate, burst = self.budgets[kind]
+            if bucket.full_at(rate * self.ip_factor, burst * self.ip_factor) <= now:
+                del self._ip_buckets[(ip, kind)]
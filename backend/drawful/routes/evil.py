@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 
 from ..config import Config
 from ..game import service
+from ..utils.profiler import profiler
 
 bp = Blueprint("evil", __name__)
 
@@ -47,4 +48,25 @@ def evil_override(code: str):
             if pid in room.players and isinstance(score, int):
                 room.players[pid].score = score
 
+    service.touch_room(room)
+
     return jsonify({"ok": True, "room": service.room_public_state(room)})
+
+
+@bp.post("/__evil__/profile")
+def evil_profile():
+    """Sample live handlers for a while; returns collapsed stacks (flamegraph.pl input)."""
+    if not _authorized():
+        return jsonify({"error": "unauthorized"}), 401
+
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = min(max(float(data.get("seconds", 10)), 0.1), Config.PROFILE_MAX_SECONDS)
+        interval_ms = min(max(float(data.get("intervalMs", 5)), 1.0), 1000.0)
+    except (TypeError, ValueError):
+        return jsonify({"error": "invalid_params"}), 400
+
+    dump = profiler.profile(seconds, interval_ms / 1000)
+    if dump is None:
+        return jsonify({"error": "profiler_busy"}), 409
+    return Response(dump, mimetype="text/plain", headers={"X-Profile-Samples": str(profiler.samples)})
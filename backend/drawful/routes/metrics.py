@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from flask import Blueprint, Response
+
+from ..game import service
+from ..realtime import handlers
+from ..utils.metrics import Exposition
+
+bp = Blueprint("metrics", __name__)
+
+
+def _lock_samples(stats: dict, key: str, scale: float = 1.0) -> list:
+    rooms = stats["rooms"].values()
+    return [
+        ({"lock": "registry"}, stats["registry"][key] * scale),
+        ({"lock": "room"}, (sum(s[key] for s in rooms) + stats["retired"][key]) * scale),
+    ]
+
+
+@bp.get("/metrics")
+def metrics():
+    rooms = service.list_rooms()
+    out = Exposition()
+
+    by_state: dict[str, int] = {}
+    for r in rooms:
+        by_state[r.state] = by_state.get(r.state, 0) + 1
+    out.metric(
+        "drawful_rooms",
+        "gauge",
+        "Active rooms by state.",
+        [({"state": k}, v) for k, v in sorted(by_state.items())],
+    )
+    out.metric("drawful_players", "gauge", "Players across all rooms.", sum(len(r.players) for r in rooms))
+    out.metric("drawful_sockets", "gauge", "Socket.IO connections on this worker.", handlers.socket_count())
+
+    out.histogram(
+        "drawful_handler_duration_seconds",
+        "Time spent in Socket.IO event handlers.",
+        handlers.handler_latency,
+        "event",
+    )
+
+    bstats = handlers.broadcast_stats()
+    out.metric(
+        "drawful_broadcast_events_total",
+        "counter",
+        "Room broadcasts by event.",
+        [({"event": k}, v) for k, v in sorted(bstats.get("byEvent", {}).items())],
+    )
+    out.metric(
+        "drawful_broadcast_writes_total",
+        "counter",
+        "Packets written to sockets by room broadcasts.",
+        bstats.get("writes", 0),
+    )
+    out.metric(
+        "drawful_broadcast_bytes_total",
+        "counter",
+        "Bytes written to sockets by room broadcasts.",
+        bstats.get("bytes", 0),
+    )
+
+    # Room lock counters: live rooms plus everything deleted rooms had counted.
+    lstats = service.lock_stats()
+    out.metric(
+        "drawful_lock_acquisitions_total",
+        "counter",
+        "Lock acquisitions.",
+        _lock_samples(lstats, "acquisitions"),
+    )
+    out.metric(
+        "drawful_lock_contended_total",
+        "counter",
+        "Lock acquisitions that had to wait.",
+        _lock_samples(lstats, "contended"),
+    )
+    out.metric(
+        "drawful_lock_wait_seconds_total",
+        "counter",
+        "Time spent waiting for locks.",
+        _lock_samples(lstats, "waitMsTotal", 1e-3),
+    )
+    out.metric(
+        "drawful_lock_wait_max_seconds",
+        "gauge",
+        "Longest single lock wait.",
+        [
+            ({"lock": "registry"}, lstats["registry"]["waitMsMax"] / 1e3),
+            ({"lock": "room"}, max((s["waitMsMax"] for s in lstats["rooms"].values()), default=0) / 1e3),
+        ],
+    )
+
+    out.metric(
+        "drawful_draw_history_elements",
+        "gauge",
+        "Scene elements kept across rooms.",
+        sum(len(r.draw_history) for r in rooms),
+    )
+    out.metric(
+        "drawful_chat_history_messages",
+        "gauge",
+        "Chat messages kept across rooms.",
+        sum(len(r.chat_history) for r in rooms),
+    )
+
+    out.metric(
+        "drawful_background_tasks",
+        "gauge",
+        "Running background tasks by name.",
+        [({"task": k}, v) for k, v in sorted(handlers.background_task_counts().items())],
+    )
+    out.metric(
+        "drawful_rate_limited_total",
+        "counter",
+        "Events dropped or deferred by the rate limiter.",
+        [({"kind": k}, v) for k, v in sorted(handlers.rate_limit_drops().items())],
+    )
+
+    return Response(out.text(), mimetype="text/plain; version=0.0.4")
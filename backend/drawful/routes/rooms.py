@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 
 from ..game import service
 
@@ -19,4 +19,19 @@ def get_room(code: str):
     room = service.get_room(code)
     if not room:
         return jsonify({"error": "room_not_found"}), 404
-    return jsonify(service.room_public_state(room))
+    return Response(service.room_public_state_json(room), mimetype="application/json")
+
+
+@bp.get("/rooms/<code>/replay")
+def replay_room(code: str):
+    room = service.get_room(code)
+    if not room:
+        return jsonify({"error": "room_not_found"}), 404
+    try:
+        rounds_back = max(0, int(request.args.get("roundsBack", "0")))
+    except ValueError:
+        return jsonify({"error": "invalid_params"}), 400
+    events = service.replay_round(room, rounds_back)
+    if events is None:
+        return jsonify({"error": "replay_unavailable"}), 404
+    return jsonify({"roomCode": code, "events": events})
@@ -20,5 +20,16 @@ def get_words():
         custom_words.extend([w.strip() for w in request.args.get("custom", "").split(",") if w.strip()])
     custom_words.extend([w.strip() for w in request.args.getlist("words[]") if w.strip()])
 
-    choices = service.get_word_choices(count=count, custom_words=custom_words)
+    try:
+        difficulty = int(request.args["difficulty"]) if request.args.get("difficulty") else None
+    except ValueError:
+        difficulty = None
+
+    choices = service.get_word_choices(
+        count=count,
+        custom_words=custom_words,
+        lang=request.args.get("lang") or None,
+        category=request.args.get("category") or None,
+        difficulty=difficulty,
+    )
     return jsonify({"words": choices})
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import signal
 import sys
 from pathlib import Path
 
@@ -10,11 +11,33 @@ from flask_socketio import SocketIO
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 from .config import Config
+from .game import service
 from .routes.health import bp as health_bp
 from .routes.rooms import bp as rooms_bp
 from .routes.words import bp as words_bp
 from .routes.evil import bp as evil_bp
+from .routes.metrics import bp as metrics_bp
 from .realtime.handlers import register_socketio_handlers
+from .utils.serializers import socketio_serializer_options
+
+
+def _snapshot_on_sigterm() -> None:
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def handler(signum, frame):
+        try:
+            service.save_snapshot(cooperative=False)
+        finally:
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise SystemExit(0)
+
+    try:
+        signal.signal(signal.SIGTERM, handler)
+    except ValueError:
+        # Not the main thread (e.g. created inside a test runner thread).
+        pass
 
 
 def create_app() -> tuple[Flask, SocketIO]:
@@ -49,18 +72,28 @@ def create_app() -> tuple[Flask, SocketIO]:
         else:
             async_mode = "eventlet"
 
+    # Multi-worker: broadcasts must go through a shared queue so they reach
+    # sockets held by other processes (run N workers behind nginx ip_hash).
+    message_queue = Config.SOCKETIO_MESSAGE_QUEUE or (Config.REDIS_URL if Config.ROOM_STORE == "redis" else "")
+
     socketio = SocketIO(
         app,
         cors_allowed_origins=cors_origins,
         async_mode=async_mode,
+        message_queue=message_queue or None,
+        max_http_buffer_size=Config.SOCKETIO_MAX_PAYLOAD_BYTES,
+        **socketio_serializer_options(Config.SOCKETIO_SERIALIZER),
     )
 
     app.register_blueprint(health_bp, url_prefix="/api")
     app.register_blueprint(rooms_bp, url_prefix="/api")
     app.register_blueprint(words_bp, url_prefix="/api")
     app.register_blueprint(evil_bp, url_prefix="/api")
+    app.register_blueprint(metrics_bp, url_prefix="/api")
 
     register_socketio_handlers(socketio)
+    if Config.SNAPSHOT_PATH:
+        _snapshot_on_sigterm()
 
     if dist_dir.exists():
         @app.get("/")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+from threading import Lock, RLock
+
+
+class InstrumentedLock:
+    """Re-entrant lock that records how often and how long callers wait for it."""
+
+    def __init__(self, name: str = "") -> None:
+        self.name = name
+        self._lock = RLock()
+        self._stats_lock = Lock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.wait_ns_total = 0
+        self.wait_ns_max = 0
+
+    def acquire(self) -> None:
+        if self._lock.acquire(blocking=False):
+            waited = 0
+        else:
+            start = time.perf_counter_ns()
+            self._lock.acquire()
+            waited = time.perf_counter_ns() - start
+
+        with self._stats_lock:
+            self.acquisitions += 1
+            if waited:
+                self.contended += 1
+                self.wait_ns_total += waited
+                if waited > self.wait_ns_max:
+                    self.wait_ns_max = waited
+
+    def release(self) -> None:
+        self._lock.release()
+
+    def __enter__(self) -> "InstrumentedLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "acquisitions": self.acquisitions,
+                "contended": self.contended,
+                "waitMsTotal": self.wait_ns_total / 1e6,
+                "waitMsMax": self.wait_ns_max / 1e6,
+            }
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from threading import Lock
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    """Latency histogram per label value, with Prometheus-style upper bounds."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = Lock()
+        # label -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[str, list] = {}
+
+    def observe(self, label: str, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> dict[str, tuple[list[int], float, int]]:
+        with self._lock:
+            return {k: (list(v[0]), v[1], v[2]) for k, v in self._series.items()}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict[str, str] | None) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class Exposition:
+    """Builds the Prometheus text exposition format (version 0.0.4)."""
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+
+    def metric(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        samples: list[tuple[dict[str, str] | None, float]] | float,
+    ) -> None:
+        if not isinstance(samples, list):
+            samples = [(None, samples)]
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self._lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(self, name: str, help_text: str, hist: Histogram, label: str) -> None:
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} histogram")
+        bounds = [_number(b) for b in hist.buckets] + ["+Inf"]
+        for value, (counts, total, count) in sorted(hist.snapshot().items()):
+            cumulative = 0
+            for le, n in zip(bounds, counts):
+                cumulative += n
+                self._lines.append(f"{name}_bucket{_labels({label: value, 'le': le})} {cumulative}")
+            self._lines.append(f"{name}_sum{_labels({label: value})} {_number(total)}")
+            self._lines.append(f"{name}_count{_labels({label: value})} {count}")
+
+    def text(self) -> str:
+        return "\n".join(self._lines) + "\n"
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from .threads import os_threading
+
+
+# id(frame of attributed()) -> (event, room code), filled only while sampling.
+_contexts: dict[int, tuple[str, str]] = {}
+
+
+def attributed(event: str, room_code: Any, fn: Callable, *args: Any) -> Any:
+    """Call ``fn(*args)``; samples taken inside it are filed under event and room."""
+    if not profiler.active:
+        return fn(*args)
+    key = id(sys._getframe())
+    _contexts[key] = (event, room_code if isinstance(room_code, str) and room_code else "-")
+    try:
+        return fn(*args)
+    finally:
+        _contexts.pop(key, None)
+
+
+_MARKER = attributed.__code__
+
+
+def _label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _clean(part: str) -> str:
+    return part.replace(";", ":").replace(" ", "_")
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for code running under ``attributed``.
+
+    A real OS thread reads every thread's current frame at a fixed interval.
+    Only stacks inside an ``attributed`` call are kept, rooted at
+    ``event;room`` and trimmed to the frames below the marker. Under eventlet
+    all green threads share one OS thread, so each sample is whichever
+    greenlet was running at that moment.
+    """
+
+    def __init__(self) -> None:
+        self.active = False
+        self._lock = threading.Lock()
+        self._stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def _sample(self, frame) -> None:
+        stack: list[str] = []
+        while frame is not None:
+            if frame.f_code is _MARKER:
+                event, room = _contexts.get(id(frame), ("?", "-"))
+                stack.append(_clean(room))
+                stack.append(_clean(event))
+                self._stacks[";".join(reversed(stack))] += 1
+                return
+            stack.append(_label(frame.f_code))
+            frame = frame.f_back
+
+    def profile(self, seconds: float, interval: float = 0.005) -> str | None:
+        """Sample for ``seconds`` and return collapsed stacks; None if already running.
+
+        Blocks the caller, cooperatively under eventlet.
+        """
+        with self._lock:
+            if self.active:
+                return None
+            self.active = True
+            self._stacks = Counter()
+            self.samples = 0
+
+        real_threading, real_sleep = os_threading()
+        thread = real_threading.Thread(target=self._sampler, args=(seconds, interval, real_sleep), daemon=True)
+        thread.start()
+        while self.active:
+            time.sleep(0.05)
+        return "".join(f"{stack} {n}\n" for stack, n in self._stacks.most_common())
+
+    def _sampler(self, seconds: float, interval: float, sleep: Callable[[float], None]) -> None:
+        try:
+            me = os_threading()[0].get_ident()
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                self.samples += 1
+                for tid, frame in sys._current_frames().items():
+                    if tid != me:
+                        self._sample(frame)
+                sleep(interval)
+        finally:
+            self.active = False
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:  # Optional fast JSON backend.
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class OrjsonModule:
+    """``json``-module shaped wrapper around orjson for python-socketio.
+
+    Formatting keyword arguments (``separators`` etc.) are ignored: orjson
+    always emits compact UTF-8. Payloads orjson rejects (ints beyond 64 bits,
+    non-string dict keys, both possible in client-sent elements) go through
+    stdlib json instead.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode("utf-8")
+        except TypeError:
+            return json.dumps(obj, separators=(",", ":"))
+
+    @staticmethod
+    def loads(s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def socketio_serializer_options(name: str) -> dict:
+    """Keyword arguments for ``SocketIO(...)`` selecting the packet serializer.
+
+    ``json``: stdlib json. ``orjson``: same wire format, faster encoding.
+    ``auto``: orjson when installed, else json. ``msgpack``: binary packets;
+    needs the msgpack package and clients using socket.io-msgpack-parser.
+    """
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "json":
+        return {}
+    if name == "orjson":
+        if orjson is None:
+            raise ValueError("SOCKETIO_SERIALIZER=orjson requires the orjson package")
+        return {"json": OrjsonModule}
+    if name == "msgpack":
+        return {"serializer": "msgpack"}
+    raise ValueError(f"unknown SOCKETIO_SERIALIZER: {name}")
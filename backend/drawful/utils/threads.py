@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+
+def os_threading():
+    """Real OS ``threading`` module and ``sleep``, even under eventlet monkey patching."""
+    # Only look at eventlet if it is already loaded: importing it off the main
+    # thread breaks Thread.join for that thread.
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        return patcher.original("threading"), patcher.original("time").sleep
+    return threading, time.sleep
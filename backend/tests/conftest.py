@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Tests import the app as the top-level ``drawful`` package, like wsgi.py does
+# when run from backend/.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
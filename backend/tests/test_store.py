@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+
+import fakeredis
+import pytest
+
+from drawful.game.models import Player, Room
+from drawful.game.store import RedisRoomStore
+
+CODE = "abcd"
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _store(server) -> RedisRoomStore:
+    return RedisRoomStore(fakeredis.FakeRedis(server=server))
+
+
+def _new_room(store: RedisRoomStore, players: int = 4) -> Room:
+    room = Room(code=CODE, owner_id="p0", state="playing", drawer_id="p0", word="cat")
+    for i in range(players):
+        room.players[f"p{i}"] = Player(id=f"p{i}", name=f"player{i}")
+    assert store.add(room)
+    return room
+
+
+def _mutate(store: RedisRoomStore, fn) -> None:
+    # What service._mutating does around every change.
+    room = store.get(CODE)
+    with room.lock:
+        room.version += 1
+        fn(room)
+        store.save(room)
+
+
+def _run_concurrently(jobs) -> None:
+    barrier = threading.Barrier(len(jobs))
+    errors = []
+
+    def run(job):
+        barrier.wait()
+        try:
+            job()
+        except Exception as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(job,)) for job in jobs]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+
+
+def test_concurrent_votes_from_two_workers_are_all_counted(server):
+    workers = [_store(server), _store(server)]
+    _new_room(workers[0], players=8)
+    counts = []
+
+    def vote(i):
+        _mutate(workers[i % 2], lambda room: counts.append(workers[i % 2].add_vote(room, "abort", f"p{i}")))
+
+    _run_concurrently([lambda i=i: vote(i) for i in range(8)])
+
+    assert max(counts) == 8
+    assert _store(server).get(CODE).abort_votes == {f"p{i}" for i in range(8)}
+    for worker in workers:
+        assert worker.get(CODE).abort_votes == {f"p{i}" for i in range(8)}
+
+
+def test_concurrent_guesses_score_each_player_once(server):
+    workers = [_store(server), _store(server)]
+    _new_room(workers[0], players=7)
+    guessers = [f"p{i}" for i in range(1, 7)] + ["spectator"]
+    scored = []
+
+    def guess(i, guesser):
+        store = workers[i % 2]
+        _mutate(store, lambda room: scored.append(store.record_guess(room, guesser, 10, 5)))
+
+    # Every guesser twice, once through each worker.
+    jobs = [lambda i=i, g=g: guess(i, g) for i, g in enumerate(guessers)]
+    jobs += [lambda i=i, g=g: guess(i + 1, g) for i, g in enumerate(guessers)]
+    _run_concurrently(jobs)
+
+    assert scored.count(True) == len(guessers)
+    room = _store(server).get(CODE)
+    assert room.correct_guessers == set(guessers)
+    assert {pid: p.score for pid, p in room.players.items()} == {
+        "p0": 5 * len(guessers),
+        **{f"p{i}": 10 for i in range(1, 7)},
+    }
+    assert "spectator" not in room.players
+    for worker in workers:
+        assert worker.get(CODE).players["p0"].score == 5 * len(guessers)
+
+
+def test_saves_from_a_stale_copy_keep_the_other_workers_changes(server):
+    a, b = _store(server), _store(server)
+    _new_room(a)
+    room_a, room_b = a.get(CODE), b.get(CODE)
+
+    with room_a.lock:
+        room_a.owner_id = "p1"
+        room_a.players["p2"].score = 7
+        room_a.version += 1
+        a.save(room_a)
+    with room_b.lock:
+        # room_b has not seen a's save yet.
+        room_b.round_duration_sec = 90
+        room_b.players["p3"].name = "renamed"
+        room_b.custom_words = ["dog"]
+        room_b.version += 1
+        b.save(room_b)
+
+    for room in (room_b, _store(server).get(CODE), a.get(CODE)):
+        assert room.owner_id == "p1"
+        assert room.round_duration_sec == 90
+        assert room.players["p2"].score == 7
+        assert room.players["p3"].name == "renamed"
+        assert room.custom_words == ["dog"]
+    assert a.get(CODE) is room_a
+    assert room_a.version == room_b.version
+
+
+def test_concurrent_saves_of_different_players(server):
+    workers = [_store(server), _store(server)]
+    _new_room(workers[0], players=6)
+
+    def rename(i):
+        for n in range(20):
+            _mutate(workers[i % 2], lambda room: setattr(room.players[f"p{i}"], "name", f"p{i}-{n}"))
+
+    _run_concurrently([lambda i=i: rename(i) for i in range(6)])
+
+    room = _store(server).get(CODE)
+    assert {pid: p.name for pid, p in room.players.items()} == {f"p{i}": f"p{i}-19" for i in range(6)}
+
+
+def test_removed_fields_and_players_are_deleted(server):
+    store = _store(server)
+    room = _new_room(store)
+    with room.lock:
+        room.word = None
+        room.drawer_id = None
+        del room.players["p3"]
+        room.version += 1
+        store.save(room)
+
+    fresh = _store(server).get(CODE)
+    assert fresh.word is None and fresh.drawer_id is None
+    assert set(fresh.players) == {"p0", "p1", "p2"}
@@ -1,8 +1,11 @@
 import { useEffect, useMemo, useRef, useState } from 'react'
 import { useNavigate, useParams } from 'react-router-dom'
 import { getSocket } from '../realtime/socket'
+import { serverNow, startClockSync } from '../realtime/clock'
+import { getSceneSeq } from '../realtime/sceneSeq'
+import { applyRoomStatePatch } from '../realtime/statePatch'
 import { loadProfile, saveProfile } from '../storage/profile'
-import type { ChatMessage, RoomState } from '../types/game'
+import type { ChatMessage, RoomState, RoomStatePatch } from '../types/game'
 import CanvasBoard, { StrokePayload } from '../ui/CanvasBoard'
 import ChatPanel from '../ui/ChatPanel'
 import PlayerList from '../ui/PlayerList'
@@ -14,10 +17,13 @@ export default function Room() {
   const [profile, setProfile] = useState(() => loadProfile())
 
   const [room, setRoom] = useState<RoomState | null>(null)
+  const roomRef = useRef<RoomState | null>(null)
+  // Last chat sequence number seen, so reconnects only fetch newer messages.
+  const chatSeqRef = useRef<number | null>(null)
   const [messages, setMessages] = useState<ChatMessage[]>([])
   const [socketId, setSocketId] = useState<string>('')
   const [err, setErr] = useState<string>('')
-  const [nowMs, setNowMs] = useState<number>(Date.now())
+  const [nowMs, setNowMs] = useState<number>(serverNow())
 
   const [toast, setToast] = useState<string>('')
   const redirectTimerRef = useRef<number | null>(null)
@@ -60,17 +66,56 @@ export default function Room() {
     setRoundsPerMatchInput(String((room as any).roundsPerMatch ?? ''))
   }, [room?.code, room?.roundDurationSec, room?.ownerId])
 
+  // Countdowns run off the synced server clock; the server no longer ticks.
+  const countingDown = room?.state === 'choosing' || room?.state === 'playing' || room?.state === 'reveal'
+  useEffect(() => {
+    if (!countingDown) return
+    setNowMs(serverNow())
+    const id = window.setInterval(() => setNowMs(serverNow()), 250)
+    return () => window.clearInterval(id)
+  }, [countingDown])
+
   useEffect(() => {
     const s = getSocket()
 
     const onConnect = () => {
       setSocketId(s.id || '')
       if (!profileReady) return
-      s.emit('room:join', { roomCode, name: profile.name, avatar: profile.avatar, playerKey: profile.playerKey })
+      s.emit('room:join', {
+        roomCode,
+        name: profile.name,
+        avatar: profile.avatar,
+        playerKey: profile.playerKey,
+        chatSeq: chatSeqRef.current ?? undefined,
+        drawSeq: getSceneSeq(roomCode),
+        freedrawCodec: true,
+        clockSync: true,
+      })
+    }
+
+    const ackRoomState = (state: RoomState) => {
+      if (typeof state.version !== 'number') return
+      s.emit('room:state_ack', { roomCode, version: state.version, view: state.view || 'public' })
     }
 
     const onRoomState = (payload: RoomState) => {
+      roomRef.current = payload
       setRoom(payload)
+      ackRoomState(payload)
+    }
+
+    const onRoomStatePatch = (patch: RoomStatePatch) => {
+      if (patch?.code !== roomCode) return
+      const current = roomRef.current
+      if (!current || typeof current.version !== 'number' || current.version < patch.baseVersion) {
+        s.emit('room:state_resync', { roomCode })
+        return
+      }
+      if (current.version >= patch.version) return
+      const next = applyRoomStatePatch(current, patch)
+      roomRef.current = next
+      setRoom(next)
+      ackRoomState(next)
     }
 
     const onRoomError = (payload: any) => {
@@ -88,13 +133,27 @@ export default function Room() {
     }
 
     const onChat = (payload: ChatMessage) => {
+      if (typeof payload?.seq === 'number') {
+        // Already delivered by a chat:sync.
+        if (chatSeqRef.current !== null && payload.seq <= chatSeqRef.current) return
+        chatSeqRef.current = payload.seq
+      }
       setMessages((prev) => [...prev.slice(-199), payload])
     }
 
     const onChatSync = (payload: any) => {
       if (payload?.roomCode !== roomCode) return
-      const msgs = Array.isArray(payload?.messages) ? (payload.messages as ChatMessage[]) : []
-      setMessages(msgs.slice(-200))
+      const raw = Array.isArray(payload?.messages) ? (payload.messages as Omit<ChatMessage, 'roomCode'>[]) : []
+      let msgs: ChatMessage[] = raw.map((m) => ({ ...m, roomCode }))
+      const seen = chatSeqRef.current
+      if (typeof payload?.seq === 'number') chatSeqRef.current = payload.seq
+      if (payload?.incremental) {
+        // Messages that arrived live between the join request and the sync.
+        if (seen !== null) msgs = msgs.filter((m) => typeof m.seq !== 'number' || m.seq > seen)
+        setMessages((prev) => [...prev, ...msgs].slice(-200))
+      } else {
+        setMessages(msgs.slice(-200))
+      }
     }
 
     const onGuessCorrect = (payload: any) => {
@@ -105,12 +164,6 @@ export default function Room() {
       ])
     }
 
-    const onTick = (payload: any) => {
-      if (payload?.roomCode !== roomCode) return
-      const n = Number(payload?.nowMs)
-      setNowMs(Number.isFinite(n) ? n : Date.now())
-    }
-
     const onReveal = (payload: any) => {
       if (payload?.roomCode !== roomCode) return
       setMessages((prev) => [
@@ -119,13 +172,15 @@ export default function Room() {
       ])
     }
 
+    const stopClockSync = startClockSync(s)
+
     s.on('connect', onConnect)
     s.on('room:state', onRoomState)
+    s.on('room:state_patch', onRoomStatePatch)
     s.on('room:error', onRoomError)
     s.on('chat:message', onChat)
     s.on('chat:sync', onChatSync)
     s.on('guess:correct', onGuessCorrect)
-    s.on('game:tick', onTick)
     s.on('game:reveal', onReveal)
 
     if (s.connected) {
@@ -134,13 +189,14 @@ export default function Room() {
 
     return () => {
       s.emit('room:leave', { roomCode })
+      stopClockSync()
       s.off('connect', onConnect)
       s.off('room:state', onRoomState)
+      s.off('room:state_patch', onRoomStatePatch)
       s.off('room:error', onRoomError)
       s.off('chat:message', onChat)
       s.off('chat:sync', onChatSync)
       s.off('guess:correct', onGuessCorrect)
-      s.off('game:tick', onTick)
       s.off('game:reveal', onReveal)
 
       if (redirectTimerRef.current) {
@@ -670,7 +726,16 @@ export default function Room() {
 
                     setShowProfileModal(false)
                     if (s.connected) {
-                      s.emit('room:join', { roomCode, name: p.name, avatar: p.avatar, playerKey: p.playerKey })
+                      s.emit('room:join', {
+                        roomCode,
+                        name: p.name,
+                        avatar: p.avatar,
+                        playerKey: p.playerKey,
+                        chatSeq: chatSeqRef.current ?? undefined,
+                        drawSeq: getSceneSeq(roomCode),
+                        freedrawCodec: true,
+                        clockSync: true,
+                      })
                     }
                   }}
                 >
@@ -0,0 +1,54 @@
+import type { Socket } from 'socket.io-client'
+
+// Offset between the server clock and Date.now(), estimated NTP-style from
+// clock:ping round trips; the lowest-RTT sample of each burst wins.
+let offsetMs = 0
+
+const BURST_SIZE = 5
+const BURST_SPACING_MS = 150
+const RESYNC_INTERVAL_MS = 60_000
+
+export function serverNow(): number {
+  return Date.now() + offsetMs
+}
+
+export function startClockSync(s: Socket): () => void {
+  let bestRtt = Infinity
+  let timers: number[] = []
+
+  const ping = () => {
+    const t0 = Date.now()
+    s.timeout(5000).emit('clock:ping', { t0 }, (err: unknown, resp: any) => {
+      if (err) return
+      const t1 = Date.now()
+      const serverMs = Number(resp?.serverMs)
+      if (!Number.isFinite(serverMs)) return
+      const rtt = t1 - t0
+      if (rtt > bestRtt) return
+      bestRtt = rtt
+      offsetMs = serverMs - (t0 + rtt / 2)
+    })
+  }
+
+  const burst = () => {
+    // Pings of the previous burst have fired (or are superseded by this one).
+    for (const t of timers) window.clearTimeout(t)
+    timers = []
+    bestRtt = Infinity
+    for (let i = 0; i < BURST_SIZE; i++) {
+      timers.push(window.setTimeout(ping, i * BURST_SPACING_MS))
+    }
+  }
+
+  s.on('connect', burst)
+  if (s.connected) burst()
+  const interval = window.setInterval(() => {
+    if (s.connected) burst()
+  }, RESYNC_INTERVAL_MS)
+
+  return () => {
+    s.off('connect', burst)
+    window.clearInterval(interval)
+    for (const t of timers) window.clearTimeout(t)
+  }
+}
@@ -0,0 +1,17 @@
+// Inverse of backend/drawful/game/freedraw.py: rebuilds Excalidraw `points`
+// from the quantized, delta-encoded `pointsDelta` / `pointsScale` form.
+export function decodeFreedrawElement(el: any): any {
+  const deltas = el?.pointsDelta
+  if (!Array.isArray(deltas)) return el
+  const scale = Number(el.pointsScale) || 1
+  const { pointsDelta: _d, pointsScale: _s, ...rest } = el
+  const points: [number, number][] = []
+  let x = 0
+  let y = 0
+  for (let i = 0; i + 1 < deltas.length; i += 2) {
+    x += deltas[i]
+    y += deltas[i + 1]
+    points.push([x / scale, y / scale])
+  }
+  return { ...rest, points }
+}
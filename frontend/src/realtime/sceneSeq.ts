@@ -0,0 +1,17 @@
+// Scene sequence number each mounted board has fully applied, per room. Sent
+// with room:join so the server can answer draw:sync with only newer changes.
+const seqs = new Map<string, number>()
+
+export function getSceneSeq(roomCode: string): number | undefined {
+  return seqs.get(roomCode)
+}
+
+export function setSceneSeq(roomCode: string, seq: unknown) {
+  if (typeof seq === 'number' && Number.isFinite(seq)) {
+    seqs.set(roomCode, seq)
+  }
+}
+
+export function forgetSceneSeq(roomCode: string) {
+  seqs.delete(roomCode)
+}
@@ -1,12 +1,16 @@
 import { io, Socket } from 'socket.io-client'
+import * as msgpackParser from 'socket.io-msgpack-parser'
 
 let socket: Socket | null = null
 
 export function getSocket(): Socket {
   if (!socket) {
     const disableWebsocket = import.meta.env.VITE_SOCKETIO_DISABLE_WEBSOCKET === '1'
+    // Must match the server's SOCKETIO_SERIALIZER=msgpack.
+    const useMsgpack = import.meta.env.VITE_SOCKETIO_PARSER === 'msgpack'
     socket = io('/', {
       transports: disableWebsocket ? ['polling'] : ['websocket', 'polling'],
+      ...(useMsgpack ? { parser: msgpackParser } : {}),
     })
   }
   return socket
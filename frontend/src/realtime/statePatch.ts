@@ -0,0 +1,22 @@
+import type { RoomState, RoomStatePatch } from '../types/game'
+
+export function applyRoomStatePatch(prev: RoomState, patch: RoomStatePatch): RoomState {
+  const next: any = { ...prev, ...(patch.set || {}) }
+  for (const key of patch.unset || []) {
+    delete next[key]
+  }
+
+  const removed = new Set(patch.removedPlayers || [])
+  const players = prev.players.filter((p) => !removed.has(p.id))
+  for (const p of patch.players || []) {
+    const idx = players.findIndex((x) => x.id === p.id)
+    if (idx >= 0) {
+      players[idx] = p
+    } else {
+      players.push(p)
+    }
+  }
+  next.players = players
+  next.version = patch.version
+  return next as RoomState
+}
@@ -8,6 +8,8 @@ export type Player = {
 
 export type RoomState = {
   code: string
+  version?: number
+  view?: 'public' | 'drawer'
   ownerId: string
   state: 'lobby' | 'choosing' | 'playing' | 'reveal'
   round: number
@@ -29,8 +31,20 @@ export type RoomState = {
   wordChoices?: string[]
 }
 
+export type RoomStatePatch = {
+  code: string
+  view: 'public' | 'drawer'
+  baseVersion: number
+  version: number
+  set: Partial<RoomState>
+  unset: string[]
+  players: Player[]
+  removedPlayers: string[]
+}
+
 export type ChatMessage = {
   roomCode: string
   from: string
   text: string
+  seq?: number
 }
@@ -1,5 +1,7 @@
 import { Component, type ReactNode, useEffect, useMemo, useRef, useState } from 'react'
 import { Excalidraw } from '@excalidraw/excalidraw'
+import { decodeFreedrawElement } from '../realtime/freedraw'
+import { forgetSceneSeq, setSceneSeq } from '../realtime/sceneSeq'
 import { getSocket } from '../realtime/socket'
 
 export type Point = { x: number; y: number }
@@ -136,15 +138,17 @@ export default function CanvasBoard({
     s.emit('draw:excalidraw_change', { roomCode, elements: changed })
   }
 
-  function applySyncedElements(elements: any) {
-    if (!excalidrawAPI) return
-    if (!Array.isArray(elements)) return
+  function applySyncedElements(incoming: any, opts: { reset?: boolean; deleted?: string[] } = {}): boolean {
+    if (!excalidrawAPI) return false
+    if (!Array.isArray(incoming)) return false
+    const elements = incoming.map(decodeFreedrawElement)
 
     isApplyingRemote.current = true
     suppressUntilMsRef.current = Date.now() + 200
     try {
-      const current = excalidrawAPI.getSceneElements()
-      const merged = [...current]
+      const deleted = new Set(opts.deleted || [])
+      const current = opts.reset ? [] : excalidrawAPI.getSceneElements()
+      const merged = current.filter((m: any) => !deleted.has(m.id))
 
       for (const el of elements) {
         const idx = merged.findIndex((m) => m.id === el.id)
@@ -169,6 +173,7 @@ export default function CanvasBoard({
     } finally {
       isApplyingRemote.current = false
     }
+    return true
   }
 
   function clearBoard() {
@@ -187,18 +192,20 @@ export default function CanvasBoard({
   useEffect(() => {
     const onRemoteChange = (payload: any) => {
       if (payload?.roomCode !== roomCode) return
-      applySyncedElements(payload?.elements)
+      if (applySyncedElements(payload?.elements)) setSceneSeq(roomCode, payload?.seq)
     }
 
     const onRemoteClear = (payload: any) => {
       if (payload?.roomCode !== roomCode) return
       clearBoard()
+      if (excalidrawAPI) setSceneSeq(roomCode, payload?.seq)
     }
 
     const onSync = (payload: any) => {
       if (payload?.roomCode !== roomCode) return
-      if (Array.isArray(payload?.elements)) {
-        applySyncedElements(payload.elements)
+      const deleted = Array.isArray(payload?.deleted) ? (payload.deleted as string[]) : []
+      if (applySyncedElements(payload?.elements, { reset: !!payload?.reset, deleted })) {
+        setSceneSeq(roomCode, payload?.seq)
       }
     }
 
@@ -210,6 +217,8 @@ export default function CanvasBoard({
       s.off('draw:excalidraw_change', onRemoteChange)
       s.off('draw:clear', onRemoteClear)
       s.off('draw:sync', onSync)
+      // The next board starts empty and needs the whole scene.
+      forgetSceneSeq(roomCode)
     }
   }, [roomCode, s, excalidrawAPI])
 
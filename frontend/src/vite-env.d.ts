@@ -1 +1,3 @@
 /// <reference types="vite/client" />
+
+declare module 'socket.io-msgpack-parser'